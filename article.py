@@ -0,0 +1,124 @@
+import json
+import re
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from util import ARTICLE_BASE_URL, build_article_slug
+
+# 文章来源
+LISTING = "Listing"
+NEWS = "News"
+
+# 页面中包含公告数据的script标签
+APP_DATA_PATTERN = re.compile(r'<script id="__APP_DATA" type="application/json".*?>(.*?)</script>', re.DOTALL)
+
+
+def format_release_date(release_date: int) -> str:
+    """将毫秒时间戳格式化为可读时间"""
+    return datetime.fromtimestamp(release_date/1000).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class Article:
+    """不可变的公告记录
+
+    使用__slots__减少内存占用,格式化时间和链接在首次访问时计算并缓存。
+    币安文章的链接由标题和code生成,其他交易所的文章直接携带url。
+    """
+    __slots__ = ('id', 'code', 'title', 'release_date', 'catalog', 'url', '_formatted_date', '_slug')
+
+    def __init__(self, id: Any, code: str, title: str, release_date: int, catalog: str,
+                 url: Optional[str] = None):
+        set_attr = object.__setattr__
+        set_attr(self, 'id', id)
+        set_attr(self, 'code', code)
+        set_attr(self, 'title', title)
+        set_attr(self, 'release_date', release_date)
+        # 只有来源会在文章之间重复,code和标题每篇文章各不相同,驻留只会增大驻留表
+        set_attr(self, 'catalog', sys.intern(catalog))
+        set_attr(self, 'url', url)
+        set_attr(self, '_formatted_date', None)
+        set_attr(self, '_slug', None)
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any], catalog: str) -> 'Article':
+        """从页面原始数据构建,兼容catalogDetail(releaseDate)和latestArticles(publishDate)两种格式"""
+        release_date = raw.get('releaseDate')
+        if release_date is None:
+            release_date = raw.get('publishDate', 0)
+        return cls(raw['id'], raw['code'], raw['title'], release_date, catalog)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Article):
+            return NotImplemented
+        return (self.id, self.code, self.title, self.release_date, self.catalog, self.url) == \
+            (other.id, other.code, other.title, other.release_date, other.catalog, other.url)
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.title, self.release_date))
+
+    def __repr__(self) -> str:
+        return f"Article(id={self.id!r}, title={self.title!r}, release_date={self.release_date!r}, catalog={self.catalog!r})"
+
+    @property
+    def fingerprint(self) -> Tuple[str, int]:
+        """用于变化检测的指纹"""
+        return self.title, self.release_date
+
+    @property
+    def formatted_date(self) -> str:
+        """格式化后的发布时间"""
+        if self._formatted_date is None:
+            object.__setattr__(self, '_formatted_date', format_release_date(self.release_date))
+        return self._formatted_date
+
+    @property
+    def slug(self) -> str:
+        """文章链接中的标题slug"""
+        if self._slug is None:
+            object.__setattr__(self, '_slug', build_article_slug(self.title))
+        return self._slug
+
+    @property
+    def link(self) -> str:
+        """文章链接,缺少code(如推送数据)时返回空字符串"""
+        if self.url:
+            return self.url
+        if not self.code:
+            return ''
+        return f"{ARTICLE_BASE_URL}{self.slug}-{self.code}"
+
+
+def parse_app_data(html_content: str) -> Optional[Dict[str, Any]]:
+    """从页面HTML中取出并解析APP_DATA,找不到时返回None"""
+    match = APP_DATA_PATTERN.search(html_content)
+    if not match:
+        return None
+    return json.loads(match.group(1))
+
+
+def find_listing_route(app_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """在APP_DATA中查找包含catalogDetail的路由数据,找不到时返回None"""
+    for route_content in app_data['appState']['loader']['dataByRouteId'].values():
+        if 'catalogDetail' in route_content:
+            return route_content
+    return None
+
+
+def listing_records(route_data: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """将路由数据中的两个公告列表展开为 (来源, 原始文章) 记录"""
+    records = [(LISTING, raw) for raw in route_data['catalogDetail']['articles']]
+    records += [(NEWS, raw) for raw in route_data.get('latestArticles') or []]
+    return records
+
+
+def listing_record_to_article(record: Tuple[str, Dict[str, Any]]) -> Article:
+    """将listing_records展开的 (来源, 原始文章) 记录转换为Article,链接在首次访问Article.link时生成"""
+    catalog, raw = record
+    return Article.from_raw(raw, catalog)
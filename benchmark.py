@@ -0,0 +1,251 @@
+"""热点函数微基准测试
+
+覆盖公告页解析(与BinanceListingSource相同的 parse_app_data -> find_listing_route
+-> listing_records -> listing_record_to_article 调用链,不含写文件和日志)、
+emoji.get_emoji_and_type、util.build_article_link、util.build_message
+和 templates.render_article(缓存命中),
+输出每个函数的 ops/sec 和单次调用的内存分配峰值。
+
+每个用例与一个固定的校准负载交替运行,基线记录用例相对校准负载的吞吐,
+减小运行期间负载波动的影响。微基准在不同机器、不同Python版本之间的差异
+远大于回退阈值,因此基线只在本地保存(不提交到仓库),用于同一台机器上修改前后的对比。
+
+用法:
+    python benchmark.py --save               # 修改前在本机运行并保存基线
+    python benchmark.py                      # 修改后运行并与本机基线对比
+    python benchmark.py --threshold 0.15     # 吞吐下降超过15%视为回退(默认20%)
+"""
+import argparse
+import json
+import re
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Any
+
+from emoji import get_emoji_and_type
+from article import (
+    Article,
+    LISTING,
+    parse_app_data,
+    find_listing_route,
+    listing_records,
+    listing_record_to_article,
+)
+from templates import MARKDOWN, TEXT, render_article
+from util import build_article_link, build_message
+
+BASELINE_FILE = Path("benchmark_baseline.json")
+DEFAULT_THRESHOLD = 0.2
+REPEAT = 7
+
+# 标题语料,覆盖分类表的前、中、后部关键词以及未命中的情况
+TITLE_CORPUS = [
+    "Binance Will List Jupiter (JUP) with Seed Tag Applied",
+    "Introducing Portal (PORTAL) on Binance Launchpool! Farm PORTAL by Staking BNB and FDUSD",
+    "Binance Will Delist ANT, MULTI, VAI and XMR on 2024-02-20",
+    "Notice of Removal of Spot Trading Pairs - 2024-03-01",
+    "Binance Futures Will Launch USDⓈ-M WIF Perpetual Contract With Up to 50x Leverage",
+    "Binance Margin Will Add New Pairs - 2024-02-28",
+    "Binance Simple Earn Adds JUP to Flexible Products",
+    "Binance Completes Integration of Arbitrum One (ARB) Network & Opens Deposits",
+    "Binance Will Support the Ethereum Network Upgrade & Hard Fork",
+    "Binance Launchpool: Join the Trading Competition and Share $100,000 in Rewards",
+    "Binance Adds JUP/USDT, WIF/FDUSD on Cross Margin",
+    "New Fiat Listings: Binance Adds TRY, EUR Pairs for SOL",
+    "币安将上线 Jupiter (JUP)",
+    "Binance Will Perform Scheduled System Maintenance",
+    "Binance Pay Supports New Merchants",
+    "What's Next: A Short Recap of the Week",
+]
+
+PAGE_SIZES = [20, 100, 500]
+
+
+def build_fixture_page(article_count: int) -> str:
+    """构造与币安公告页结构一致的HTML,包含article_count篇文章"""
+    articles = [
+        {
+            'id': 100000 + i,
+            'code': f"{i:032x}",
+            'title': TITLE_CORPUS[i % len(TITLE_CORPUS)],
+            'type': 1,
+            'releaseDate': 1700000000000 + i * 60000,
+        }
+        for i in range(article_count)
+    ]
+    latest = [
+        {
+            'id': 200000 + i,
+            'code': f"{i:032x}",
+            'title': TITLE_CORPUS[(i + 3) % len(TITLE_CORPUS)],
+            'publishDate': 1700000000000 + i * 60000,
+        }
+        for i in range(min(article_count, 20))
+    ]
+    app_data = {
+        'appState': {
+            'loader': {
+                'dataByRouteId': {
+                    'd9b2': {'navList': [{'catalogId': 48}] * 10},
+                    'd34e': {
+                        'catalogDetail': {'catalogId': 48, 'articles': articles, 'total': article_count},
+                        'latestArticles': latest,
+                    },
+                }
+            }
+        }
+    }
+    padding = "<div class=\"css-1\"><span>padding</span></div>" * (article_count * 10)
+    return (
+        "<!doctype html><html><head><title>Binance</title></head><body>"
+        f"{padding}"
+        f"<script id=\"__APP_DATA\" type=\"application/json\">{json.dumps(app_data)}</script>"
+        "</body></html>"
+    )
+
+
+def parse_listing_page(html_content: str) -> List[Article]:
+    """公告页解析的纯计算部分,与BinanceListingSource.parse/normalize相同但不保存JSON文件"""
+    route_data = find_listing_route(parse_app_data(html_content))
+    return [listing_record_to_article(record) for record in listing_records(route_data)]
+
+
+CALIBRATION_PATTERN = re.compile(r'"title": "([^"]+)"')
+CALIBRATION_DOC = json.dumps([{'id': i, 'title': f"Calibration {i}", 'values': list(range(10))} for i in range(50)])
+
+
+def calibration_workload() -> None:
+    """与热点函数类似的固定负载(JSON解析、正则、字符串处理),用于衡量机器本身的速度"""
+    data = json.loads(CALIBRATION_DOC)
+    titles = CALIBRATION_PATTERN.findall(CALIBRATION_DOC)
+    '-'.join(title.lower() for title in titles)
+    sum(item['id'] for item in data)
+
+
+def _cycle(func: Callable[[str], Any], inputs: List[str]) -> Callable[[], None]:
+    """返回每次调用时按顺序取下一个输入的无参函数"""
+    state = {'i': 0}
+    count = len(inputs)
+
+    def call():
+        i = state['i']
+        func(inputs[i])
+        state['i'] = (i + 1) % count
+    return call
+
+
+def build_cases() -> Dict[str, Callable[[], None]]:
+    cases: Dict[str, Callable[[], None]] = {}
+    for size in PAGE_SIZES:
+        page = build_fixture_page(size)
+        cases[f"parse_listing_page[{size}]"] = lambda page=page: parse_listing_page(page)
+    cases["get_emoji_and_type"] = _cycle(get_emoji_and_type, TITLE_CORPUS)
+    cases["build_article_link"] = _cycle(lambda title: build_article_link(title, "0123456789abcdef"), TITLE_CORPUS)
+    cases["build_message"] = _cycle(
+        lambda title: build_message(title, "2024-01-01 00:00:00", build_article_link(title, "0123456789abcdef")),
+        TITLE_CORPUS,
+    )
+    articles = [Article(i, f"{i:032x}", title, 1700000000000, LISTING) for i, title in enumerate(TITLE_CORPUS)]
+    for msgtype in (TEXT, MARKDOWN):
+        cases[f"render_article[{msgtype}]"] = _cycle(lambda article, msgtype=msgtype: render_article(article, msgtype), articles)
+    return cases
+
+
+def measure(call: Callable[[], None], calibration: timeit.Timer, calibration_number: int) -> Dict[str, float]:
+    """测量吞吐和单次调用的内存分配峰值
+
+    用例与校准负载交替运行,各取多次重复中最好的结果,
+    relative为用例吞吐与同一时段校准吞吐之比,不受机器速度和运行期间负载波动的影响。
+    """
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    best = best_calibration = float('inf')
+    for _ in range(REPEAT):
+        best_calibration = min(best_calibration, calibration.timeit(calibration_number))
+        best = min(best, timer.timeit(number))
+    ops_per_sec = number / best
+    calibration_ops = calibration_number / best_calibration
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'ops_per_sec': ops_per_sec,
+        'relative': ops_per_sec / calibration_ops,
+        'calibration_ops_per_sec': calibration_ops,
+        'peak_alloc_bytes': peak - before,
+    }
+
+
+def run() -> Dict[str, Any]:
+    """运行所有用例,calibration为各用例期间校准负载吞吐的中位数"""
+    calibration = timeit.Timer(calibration_workload)
+    calibration_number, _ = calibration.autorange()
+    cases = {name: measure(call, calibration, calibration_number) for name, call in build_cases().items()}
+    calibration_ops = sorted(result['calibration_ops_per_sec'] for result in cases.values())
+    return {'calibration': calibration_ops[len(calibration_ops) // 2], 'cases': cases}
+
+
+def compare(results: Dict[str, Any],
+            baseline: Dict[str, Any],
+            threshold: float) -> List[str]:
+    """返回相对吞吐(用例吞吐/校准吞吐)比基线下降超过threshold的函数"""
+    regressions = []
+    for name, result in results['cases'].items():
+        if name not in baseline['cases']:
+            continue
+        expected = baseline['cases'][name]['relative']
+        if result['relative'] < expected * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['relative']:.4f} < baseline {expected:.4f} relative to calibration "
+                f"(-{(1 - result['relative'] / expected) * 100:.1f}%)"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="热点函数微基准测试")
+    parser.add_argument('--save', action='store_true', help="保存结果为新的基线")
+    parser.add_argument('--baseline', default=str(BASELINE_FILE), help="基线文件路径")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="允许的吞吐下降比例")
+    args = parser.parse_args()
+
+    results = run()
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    if baseline:
+        print(f"machine speed vs baseline: {results['calibration'] / baseline['calibration']:.2f}x")
+    print(f"{'function':<28}{'ops/sec':>14}{'peak alloc':>14}{'vs baseline':>14}")
+    for name, result in results['cases'].items():
+        delta = ''
+        if name in baseline.get('cases', {}):
+            delta = f"{(result['relative'] / baseline['cases'][name]['relative'] - 1) * 100:+.1f}%"
+        print(f"{name:<28}{result['ops_per_sec']:>14.0f}{result['peak_alloc_bytes'] / 1024:>11.1f} KiB{delta:>14}")
+
+    if args.save:
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {baseline_path}, run with --save to record one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("Regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
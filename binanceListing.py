@@ -1,41 +1,52 @@
 import asyncio
 import json
-import re
-from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
-from collections import deque
+import time
+from typing import Optional, List, Dict, Any, Tuple
 
-from config import ALWAYS_NOTIFY, LISTING_API_URL, MONITOR_INTERVAL
+from article import (
+    Article,
+    format_release_date,
+    parse_app_data,
+    find_listing_route,
+    listing_records,
+    listing_record_to_article,
+)
+from differ import ArticleEvent, ADDED, CHANGED, REMOVED
+from config import (
+    ALWAYS_NOTIFY,
+    LISTING_API_URL,
+    ENABLE_ENRICHMENT,
+    ENABLE_PUSH,
+    PUSH_POLL_INTERVAL,
+)
+from enrich import ArticleEnricher
+from history import article_store
+from push import AnnouncementStream
+from rules import send_routed_message
+from source import Source, run_source
 from util import (
     DATA_DIR,
     LISTING_RAW_FILE,
     LISTING_PARSED_FILE,
-    send_message_async,
     log_with_time,
-    build_article_link,
-    build_message,
     fetch_and_save_html_content,
+    close_sessions,
 )
 
-last_article_ids = set()
+article_enricher = ArticleEnricher()
+push_stream: Optional[AnnouncementStream] = None
 
-ERROR_WINDOW = timedelta(minutes=15)  # 错误检测时间窗口
-ERROR_THRESHOLD = 10  # 错误次数阈值
-error_times = deque()  # 存储错误发生时间的队列
+# 已通过推送通知的标题 -> 推送时间,轮询发现同一文章时不再重复通知
+pushed_titles: Dict[str, float] = {}
+PUSHED_TITLE_TTL = 24 * 60 * 60
 
-def parse_listing_data(html_content: str) -> Optional[tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
-    """从HTML内容中解析出新币上线信息,返回(articles, latest_articles)元组"""
+def parse_listing_route(html_content: str) -> Optional[Dict[str, Any]]:
+    """从HTML内容中解析出包含公告列表的路由数据,并保存解析后的JSON"""
     try:
-        # 查找包含目标数据的script标签
-        pattern = r'<script id="__APP_DATA" type="application/json".*?>(.*?)</script>'
-        script_content = re.search(pattern, html_content, re.DOTALL)
-        
-        if not script_content:
+        json_data = parse_app_data(html_content)
+        if json_data is None:
             log_with_time("🔴 No APP_DATA script found")
             return None
-            
-        # 解析JSON数据
-        json_data = json.loads(script_content.group(1))
         
         # 保存解析后的JSON数据到data目录
         json_path = DATA_DIR / LISTING_PARSED_FILE
@@ -43,130 +54,128 @@ def parse_listing_data(html_content: str) -> Optional[tuple[List[Dict[str, Any]]
             json.dump(json_data, f, ensure_ascii=False, indent=2)
         log_with_time(f"Parsed JSON saved to {json_path}")
 
-        # 查找包含 catalogDetail 的路由
-        route_data = None
-        for route_content in json_data['appState']['loader']['dataByRouteId'].values():
-            if 'catalogDetail' in route_content:
-                route_data = route_content
-                break
-                
-        if not route_data:
+        route_data = find_listing_route(json_data)
+        if route_data is None:
             log_with_time("🔴 No route with catalogDetail found") 
-            return None
-            
-        # 获取两个列表
-        articles = route_data['catalogDetail']['articles']
-        latest_articles = route_data.get('latestArticles', [])
-        
-        # 统一时间字段
-        for article in latest_articles:
-            article['releaseDate'] = article.pop('publishDate', 0)
-            
-        return articles, latest_articles
+        return route_data
         
     except Exception as e:
         log_with_time(f"🔴 Error parsing listing data: {e}")
         return None
 
-async def save_and_parse_listings() -> Optional[tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
-    response_text = await fetch_and_save_html_content(LISTING_API_URL, LISTING_RAW_FILE)
-    if response_text is None:
-        return None
-    return parse_listing_data(response_text)
-
-async def send_new_article_notifications(articles: List[Dict[str, Any]], 
-                                       new_ids: set,
+async def send_new_article_notifications(articles: List[Article], 
                                        is_initial: bool = False) -> None:
     """发送新文章通知"""
     for article in articles:
-        if article['id'] in new_ids:
-            formatted_date = datetime.fromtimestamp(
-                article['releaseDate']/1000
-            ).strftime('%Y-%m-%d %H:%M:%S')
-            
-            message = build_message(
-                title=article['title'],
-                release_date=formatted_date,
-                link=build_article_link(article['title'], article['code']),
-            )
-            await send_message_async(message)
+        await send_routed_message(article)
 
-async def monitor() -> None:
-    """监控新币上线公告"""
-    global last_article_ids, error_times
-    log_with_time("🟢 Starting Binance listing monitor...")
-    
-    while True:
-        try:
-            # 检查新文章
-            result = await save_and_parse_listings()
-            if result is None:
-                log_with_time("🔴 No articles found in this check")
-                await asyncio.sleep(MONITOR_INTERVAL)
-                continue
-                
-            articles, latest_articles = result
-            # 合并两个列表
-            all_articles = articles + latest_articles
-
-            # 获取所有文章的ID集合
-            current_article_ids = {article['id'] for article in all_articles}
-            
-            # 首次执行时,输出详细信息
-            if len(last_article_ids) == 0:
-                log_with_time("🔵 First run, printing all current articles:")
-                for article in articles:
-                    formatted_date = datetime.fromtimestamp(
-                        article['releaseDate']/1000
-                    ).strftime('%Y-%m-%d %H:%M:%S')
-                    log_with_time(f"📄 {formatted_date} - [Listing] {article['title']}")
-                for article in latest_articles:
-                    formatted_date = datetime.fromtimestamp(
-                        article['releaseDate']/1000
-                    ).strftime('%Y-%m-%d %H:%M:%S')
-                    log_with_time(f"📄 {formatted_date} - [News] {article['title']}")
-                last_article_ids = current_article_ids
-                if ALWAYS_NOTIFY:
-                    log_with_time("🔔 ALWAYS_NOTIFY is True, sending initial notifications...")
-                    await send_new_article_notifications(all_articles, current_article_ids, True)
-                continue
-            
-            # 找出新文章ID
-            new_article_ids = current_article_ids - last_article_ids
-            
-            if new_article_ids:
-                log_with_time(f"🟢 Found {len(new_article_ids)} new articles")
-                for article in articles:
-                    if article['id'] in new_article_ids:
-                        log_with_time(f"🟢 Article: [Listing] {article['title']}")
-                for article in latest_articles:
-                    if article['id'] in new_article_ids:
-                        log_with_time(f"🟢 Article: [News] {article['title']}")
-                await send_new_article_notifications(all_articles, new_article_ids, False)
-            
-            # 更新上次的文章ID集合
-            last_article_ids = current_article_ids
-            
-        except Exception as e:
-            current_time = datetime.now()
-            # 清理超过时间窗口的错误记录
-            while error_times and current_time - error_times[0] > ERROR_WINDOW:
-                error_times.popleft()
-            
-            # 添加当前错误时间
-            error_times.append(current_time)
-            
-            # 记录错误日志
-            log_with_time(f"🔴 Error in monitor loop: {e}")
-            
-            # 只有在时间窗口内错误次数达到阈值时才发送通知
-            if len(error_times) >= ERROR_THRESHOLD:
-                await send_message_async(
-                    f"❌ Monitor News Error", 
-                    is_error=True
+async def handle_article_events(events: List[ArticleEvent]) -> None:
+    """处理一轮对比产生的变化事件,只有从未见过的新文章会推送"""
+    new_articles = []
+    enrich_articles = []
+    for event in events:
+        if event.kind == ADDED:
+            if event.fresh:
+                log_with_time(f"🟢 Article: [{event.source}] {event.article.title}")
+                enrich_articles.append(event.article)
+                if event.article.title in pushed_titles:
+                    log_with_time(f"🔵 Already notified via push: {event.article.title}")
+                else:
+                    new_articles.append(event.article)
+            else:
+                log_with_time(f"🔵 Reappeared article: [{event.source}] {event.article.title}")
+        elif event.kind == CHANGED:
+            if event.title_changed:
+                log_with_time(f"✏️ Title edited: [{event.source}] {event.previous[0]} -> {event.article.title}")
+                await send_routed_message(event.article, prefix="✏️ 公告标题更新\n")
+            if event.date_changed:
+                log_with_time(
+                    f"🕒 Article re-dated: [{event.source}] {event.article.title} "
+                    f"{format_release_date(event.previous[1])} -> {event.article.formatted_date}"
+                )
+        else:
+            log_with_time(f"⚪ Article removed from page: [{event.source}] {event.previous[0]}")
+
+    if new_articles:
+        log_with_time(f"🟢 Found {len(new_articles)} new articles")
+        await send_new_article_notifications(new_articles, False)
+    # 详情补充在后台进行,不阻塞首条通知
+    if ENABLE_ENRICHMENT:
+        for article in enrich_articles:
+            article_enricher.submit(article)
+
+class BinanceListingSource(Source):
+    """币安新币上线公告数据源"""
+    name = 'binance'
+
+    async def start(self) -> None:
+        """启动WebSocket推送"""
+        global push_stream
+        if ENABLE_PUSH and push_stream is None:
+            push_stream = AnnouncementStream(handle_pushed_article)
+            push_stream.start()
+
+    async def fetch(self) -> Optional[str]:
+        return await fetch_and_save_html_content(LISTING_API_URL, LISTING_RAW_FILE)
+
+    def parse(self, content: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        route_data = parse_listing_route(content)
+        if route_data is None:
+            # 页面返回成功但无法解析(通常是验证页),同样计入熔断器
+            self.breaker.record_failure()
+            return None
+        return listing_records(route_data)
+
+    def normalize(self, record: Tuple[str, Dict[str, Any]]) -> Article:
+        return listing_record_to_article(record)
+
+    async def handle_events(self, events: List[ArticleEvent], is_first_run: bool) -> None:
+        # 新增和修改的文章写入历史库
+        article_store.record(event.article for event in events if event.kind != REMOVED)
+        
+        # 首次执行时,输出详细信息
+        if is_first_run:
+            log_with_time("🔵 First run, printing all current articles:")
+            for event in events:
+                log_with_time(
+                    f"📄 {event.article.formatted_date} - "
+                    f"[{event.source}] {event.article.title}"
                 )
+            if ALWAYS_NOTIFY:
+                log_with_time("🔔 ALWAYS_NOTIFY is True, sending initial notifications...")
+                await send_new_article_notifications([event.article for event in events], True)
+            return
         
-        await asyncio.sleep(MONITOR_INTERVAL)
+        await handle_article_events(events)
+
+    async def wait_next_poll(self) -> None:
+        """等待下一次轮询: 推送正常时降为低频一致性检查,推送断开时立即恢复正常频率"""
+        if push_stream is not None and push_stream.healthy:
+            await push_stream.wait_disconnected(PUSH_POLL_INTERVAL)
+        else:
+            await super().wait_next_poll()
+
+binance_source = BinanceListingSource()
+
+async def handle_pushed_article(article: Article) -> None:
+    """处理WebSocket推送的公告,与轮询结果共用去重和通知流程"""
+    now = time.time()
+    for title, pushed_at in list(pushed_titles.items()):
+        if now - pushed_at > PUSHED_TITLE_TTL:
+            del pushed_titles[title]
+    
+    if article.title in pushed_titles or binance_source.differ.has_title(article.title):
+        return
+    pushed_titles[article.title] = now
+    log_with_time(f"⚡ Pushed article: [{article.catalog}] {article.title}")
+    await send_new_article_notifications([article], False)
+
+async def monitor() -> None:
+    """监控新币上线公告"""
+    try:
+        await run_source(binance_source)
+    finally:
+        await close_sessions()
 
 if __name__ == "__main__":
     asyncio.run(monitor())
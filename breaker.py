@@ -0,0 +1,187 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, List, Iterator
+
+# 熔断器状态
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 错误推送限制: 每个时间窗口内每个熔断器的最大告警次数
+ALERT_LIMIT = 5
+ALERT_WINDOW = 3600  # 时间窗口大小(秒)
+
+
+class CircuitBreaker:
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = 5,
+                 failure_window: float = 15 * 60,
+                 recovery_timeout: float = 60,
+                 max_recovery_timeout: float = 30 * 60,
+                 probe_timeout: float = 5 * 60,
+                 alert_limit: int = ALERT_LIMIT,
+                 alert_window: float = ALERT_WINDOW):
+        """初始化熔断器
+
+        Args:
+            name: 上游名称,用于日志和告警
+            failure_threshold: 时间窗口内触发熔断的失败次数
+            failure_window: 失败计数的时间窗口(秒)
+            recovery_timeout: 熔断后首次探测前的等待时间(秒)
+            max_recovery_timeout: 探测失败后等待时间翻倍的上限(秒)
+            probe_timeout: 探测请求超过该时间仍未记录结果时,允许发起新的探测(秒)
+            alert_limit: 告警窗口内的最大告警次数
+            alert_window: 告警窗口大小(秒)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.base_recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        self.probe_timeout = probe_timeout
+        self.alert_limit = alert_limit
+        self.alert_window = alert_window
+
+        self.state = CLOSED
+        self.recovery_timeout = recovery_timeout
+        self.next_probe_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+        self._probe_token = 0
+        self._failures: deque = deque()
+        self._alerts: deque = deque()
+        self._pending_alerts: List[str] = []
+
+    def allow_request(self) -> bool:
+        """判断当前是否允许请求上游
+
+        关闭状态下总是允许; 打开状态下到达探测时间后转为半开,
+        只放行一个探测请求; 半开状态下探测结果返回前拒绝其他请求,
+        探测超过probe_timeout仍未返回结果时视为丢失,重新放行一个探测。
+        """
+        if self.state == CLOSED:
+            return True
+        now = time.time()
+        if self.state == OPEN and now >= self.next_probe_at:
+            self._transition(HALF_OPEN)
+        if self.state != HALF_OPEN:
+            return False
+        if self._probe_in_flight and now - self._probe_started_at > self.probe_timeout:
+            self._log(f"⏱️ Circuit {self.name}: probe timed out, allowing a new probe")
+            self._probe_in_flight = False
+        if not self._probe_in_flight:
+            self._probe_in_flight = True
+            self._probe_started_at = now
+            self._probe_token += 1
+            return True
+        return False
+
+    @contextmanager
+    def request(self) -> Iterator[bool]:
+        """包裹一次上游请求,返回是否允许请求
+
+        请求在记录结果之前退出(如任务被取消)时释放占用的半开探测名额,
+        避免熔断器停留在半开状态且不再放行任何请求。
+
+        用法:
+            with breaker.request() as allowed:
+                if not allowed:
+                    return None
+                ...
+        """
+        allowed = self.allow_request()
+        token = self._probe_token
+        try:
+            yield allowed
+        finally:
+            if allowed and self._probe_in_flight and self._probe_token == token:
+                self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        """记录一次成功调用"""
+        self._failures.clear()
+        if self.state != CLOSED:
+            self.recovery_timeout = self.base_recovery_timeout
+            self._transition(CLOSED)
+            self._pending_alerts.append(f"✅ {self.name} 已恢复")
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """记录一次失败调用,必要时打开熔断器"""
+        now = time.time()
+        self._failures.append(now)
+        while self._failures and now - self._failures[0] > self.failure_window:
+            self._failures.popleft()
+
+        if self.state == HALF_OPEN:
+            # 探测失败,等待时间翻倍后再次探测
+            self.recovery_timeout = min(self.recovery_timeout * 2, self.max_recovery_timeout)
+            self._open(now)
+        elif self.state == CLOSED and len(self._failures) >= self.failure_threshold:
+            self._open(now)
+            self._pending_alerts.append(
+                f"❌ {self.name} 熔断开启: {len(self._failures)} 次失败, "
+                f"{int(self.recovery_timeout)} 秒后探测"
+            )
+        self._probe_in_flight = False
+
+    def take_alerts(self) -> List[str]:
+        """取出待发送的告警,超出告警次数限制的告警只记录日志"""
+        now = time.time()
+        while self._alerts and now - self._alerts[0] > self.alert_window:
+            self._alerts.popleft()
+
+        alerts = []
+        for message in self._pending_alerts:
+            if len(self._alerts) >= self.alert_limit:
+                self._log(f"Error message suppressed (limit reached): {message}")
+                continue
+            self._alerts.append(now)
+            alerts.append(message)
+        self._pending_alerts = []
+        return alerts
+
+    def _open(self, now: float) -> None:
+        self.next_probe_at = now + self.recovery_timeout
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            self._log(f"🔌 Circuit {self.name}: {self.state} -> {state}")
+            self.state = state
+
+    def _log(self, message: str) -> None:
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{current_time}] {message}")
+
+
+# 各上游的熔断器
+BREAKERS: Dict[str, CircuitBreaker] = {
+    'binance': CircuitBreaker('Binance页面', failure_threshold=10, recovery_timeout=120),
+    # 详情页使用独立的熔断器,抓取失败不影响公告列表的检测
+    'binance_detail': CircuitBreaker('Binance详情页', failure_threshold=10, recovery_timeout=300),
+    'cookie': CircuitBreaker('Cookie刷新', failure_threshold=3, recovery_timeout=300),
+    'coinglass': CircuitBreaker('Coinglass', failure_threshold=3, recovery_timeout=600),
+}
+
+
+# 企业微信机器人的熔断器,按webhook地址区分,单个频道地址失效不影响其他频道
+WEBHOOK_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """获取指定上游的熔断器"""
+    return BREAKERS[name]
+
+
+def get_webhook_breaker(webhook_url: str) -> CircuitBreaker:
+    """获取webhook地址对应的熔断器,首次使用时创建"""
+    breaker = WEBHOOK_BREAKERS.get(webhook_url)
+    if breaker is None:
+        # 日志中只显示key的末尾几位
+        breaker = CircuitBreaker(f"企业微信(...{webhook_url[-6:]})", failure_threshold=5, recovery_timeout=60)
+        WEBHOOK_BREAKERS[webhook_url] = breaker
+    return breaker
@@ -1,15 +1,26 @@
 import asyncio
 import aiohttp
-from playwright.async_api import async_playwright
 from config import COINGLASS_URL, WEBHOOK_URL, COINGLASS_FILE_INTERVAL
 from util import log_with_time
 import os
 import hashlib
 import base64
 
+# 已初始化且尚未关闭的抓取器,用于在内存过高时强制关闭浏览器
+_active_scrapers = set()
+
+
+async def close_scrapers() -> bool:
+    """关闭所有仍在运行的抓取器的浏览器和playwright驱动进程,返回是否关闭了抓取器"""
+    scrapers = list(_active_scrapers)
+    for scraper in scrapers:
+        await scraper._close()
+    return bool(scrapers)
+
 
 class CoinglassScraper:
     def __init__(self):
+        self._playwright = None
         self._browser = None
         self._context = None
         self._page = None
@@ -18,15 +29,18 @@ class CoinglassScraper:
         """初始化浏览器"""
         if not self._browser:
             try:
-                playwright = await async_playwright().start()
-                self._browser = await playwright.chromium.launch(headless=True)
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
                 self._context = await self._browser.new_context()
                 self._page = await self._context.new_page()
+                _active_scrapers.add(self)
             except Exception as e:
                 log_with_time(f"❌ 初始化浏览器失败: {str(e)}")
     
     async def _close(self):
-        """关闭浏览器"""
+        """关闭浏览器并停止playwright驱动进程"""
+        _active_scrapers.discard(self)
         if self._browser:
             try:
                 await self._browser.close()
@@ -35,9 +49,20 @@ class CoinglassScraper:
                 self._page = None
             except Exception as e:
                 log_with_time(f"❌ 关闭浏览器失败: {str(e)}")
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                log_with_time(f"❌ 停止playwright失败: {str(e)}")
+            finally:
+                self._playwright = None
     
-    async def _download_and_send_image(self):
-        """下载并发送图片到webhook"""
+    async def _download_and_send_image(self) -> bool:
+        """下载并发送图片到webhook
+        
+        Returns:
+            bool: 是否成功下载并发送
+        """
         try:
             log_with_time("🟢 开始访问 Coinglass 网页...")
             await self._page.goto(COINGLASS_URL)
@@ -59,6 +84,7 @@ class CoinglassScraper:
                 try:
                     await self._send_image_to_webhook(save_path)
                     log_with_time("🟢 图片发送成功!")
+                    return True
                 finally:
                     if os.path.exists(save_path):
                         os.remove(save_path)
@@ -68,6 +94,7 @@ class CoinglassScraper:
             
         except Exception as e:
             log_with_time(f"❌ 下载和发送图片失败: {str(e)}")
+        return False
     
     async def _send_image_to_webhook(self, image_path):
         """发送图片到企业微信webhook"""
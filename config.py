@@ -29,3 +29,42 @@ COINGLASS_URL = "https://www.coinglass.com/bull-market-peak-signals"
 # 指标图表文件间隔
 COINGLASS_FILE_INTERVAL = 24 * 60 * 60  # 24小时
 
+
+# 身份池配置: 每个身份绑定一份cookie、一致的User-Agent/客户端提示以及出口代理
+IDENTITY_POOL_SIZE = 3
+# 身份使用的出口代理列表,按顺序循环分配给各身份
+IDENTITY_PROXIES = [PROXY_URL if USE_PROXY else None]
+
+# 文章详情补充: 新文章推送后在后台抓取详情页,补充交易对、上线时间和充值开放时间
+ENABLE_ENRICHMENT = True
+ENRICH_WORKERS = 2  # 并发抓取详情页的工作协程数
+
+# 公告历史查询接口(本地HTTP),Docker中需监听0.0.0.0并映射端口才能从宿主机访问
+ENABLE_HISTORY_API = True
+HISTORY_API_HOST = os.getenv('HISTORY_API_HOST', '127.0.0.1')
+HISTORY_API_PORT = int(os.getenv('HISTORY_API_PORT', '8080'))
+
+# WebSocket公告推送: 配置API Key后启用,连接正常时HTML轮询降为低频一致性检查
+BINANCE_API_KEY = os.getenv('BINANCE_API_KEY')
+BINANCE_API_SECRET = os.getenv('BINANCE_API_SECRET')
+PUSH_WS_URL = os.getenv('PUSH_WS_URL', 'wss://api.binance.com/sapi/wss')
+PUSH_TOPIC = 'com_announcement_en'
+ENABLE_PUSH = bool(BINANCE_API_KEY and BINANCE_API_SECRET) or bool(os.getenv('PUSH_WS_URL'))
+PUSH_POLL_INTERVAL = 5 * 60  # 推送正常时的轮询间隔(秒)
+
+# 内存监控(可选): 定期记录RSS、tracemalloc分配热点和对象数量增长
+ENABLE_MEMORY_WATCHDOG = os.getenv('ENABLE_MEMORY_WATCHDOG', 'false').lower() == 'true'
+MEMORY_WATCHDOG_INTERVAL = 10 * 60  # 采样间隔(秒)
+MEMORY_RSS_LIMIT_MB = 512  # RSS超过该值时重启已注册的子系统
+MEMORY_GROWTH_LIMIT_MB_PER_HOUR = 20  # RSS增长速率超过该值时重启已注册的子系统
+
+# 订阅路由规则文件,修改后自动重新加载
+RULES_FILE = 'rules.json'
+
+# 启用的公告数据源,可选: binance, okx, bybit, upbit
+ENABLED_SOURCES = [s.strip() for s in os.getenv('ENABLED_SOURCES', 'binance').split(',') if s.strip()]
+
+# 默认推送消息格式: "text" 或 "markdown"
+NOTIFY_FORMAT = 'text'
+# 已渲染消息的缓存数量
+MESSAGE_CACHE_SIZE = 1024
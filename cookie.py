@@ -2,8 +2,26 @@ import asyncio
 import json
 from datetime import datetime
 from pathlib import Path
-from playwright.async_api import async_playwright
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set, Any
+
+# 刷新cookie时打开的浏览器,用于在内存过高时强制关闭
+_open_browsers: Set[Any] = set()
+
+async def close_browsers() -> bool:
+    """关闭所有仍在运行的cookie刷新浏览器,进行中的刷新会失败并在下次需要时重新发起
+
+    Returns:
+        是否关闭了浏览器
+    """
+    browsers = list(_open_browsers)
+    for browser in browsers:
+        _open_browsers.discard(browser)
+        try:
+            await browser.close()
+        except Exception as e:
+            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            print(f"[{current_time}] ❌ Failed to close browser: {e}")
+    return bool(browsers)
 
 class CookieManager:
     def __init__(self, cookie_file: str = "cookies.txt"):
@@ -28,19 +46,31 @@ class CookieManager:
     def _save_cookies(self) -> None:
         """保存cookie到文件"""
         try:
+            self.cookie_file.parent.mkdir(parents=True, exist_ok=True)
             self.cookie_file.write_text(self.cookie_str)
             self._log(f"📤 Saved cookies to {self.cookie_file}")
         except Exception as e:
             self._log(f"❌ Failed to save cookies: {e}")
 
-    async def update_cookies(self) -> str:
+    async def update_cookies(self,
+                             user_agent: Optional[str] = None,
+                             proxy: Optional[str] = None,
+                             extra_headers: Optional[Dict[str, str]] = None) -> str:
         """使用playwright获取新的cookie
         
+        Args:
+            user_agent: 浏览器使用的User-Agent,应与后续请求使用的保持一致
+            proxy: 浏览器使用的代理地址,应与后续请求的出口保持一致
+            extra_headers: 额外的请求头(如sec-ch-ua等客户端提示)
+        
         Returns:
             str: 新的cookie字符串
         """
         self._log("🔄 Starting to fetch new cookies...")
         
+        # playwright较重,只在需要刷新cookie时导入
+        from playwright.async_api import async_playwright
+        
         async with async_playwright() as p:
             # 配置启动参数以支持Docker环境
             browser = await p.chromium.launch(
@@ -51,9 +81,18 @@ class CookieManager:
                     '--disable-dev-shm-usage'
                 ]
             )
+            _open_browsers.add(browser)
             
             try:
-                page = await browser.new_page()
+                context_args: Dict = {}
+                if user_agent:
+                    context_args['user_agent'] = user_agent
+                if proxy:
+                    context_args['proxy'] = {'server': proxy}
+                if extra_headers:
+                    context_args['extra_http_headers'] = extra_headers
+                context = await browser.new_context(**context_args)
+                page = await context.new_page()
                 await page.goto('https://www.binance.com/en/support/announcement/new-cryptocurrency-listing')
                 await page.wait_for_load_state('networkidle')
                 
@@ -70,6 +109,7 @@ class CookieManager:
                 self._log(f"❌ Failed to fetch cookies: {e}")
                 raise
             finally:
+                _open_browsers.discard(browser)
                 await browser.close()
 
     def get_cookies(self) -> Optional[str]:
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from article import Article
+
+# 事件类型
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+# 文章指纹: (title, releaseDate)
+Fingerprint = Tuple[str, int]
+
+# 记住的已见文章id数量上限,超出后淘汰最久未出现在页面上的id
+SEEN_IDS_LIMIT = 10000
+
+
+@dataclass
+class ArticleEvent:
+    """一次文章变化事件"""
+    kind: str
+    article_id: Any
+    source: str
+    article: Optional[Article] = None
+    previous: Optional[Fingerprint] = None
+    fresh: bool = False  # 是否为从未见过的文章
+
+    @property
+    def title_changed(self) -> bool:
+        return self.kind == CHANGED and self.previous[0] != self.article.title
+
+    @property
+    def date_changed(self) -> bool:
+        return self.kind == CHANGED and self.previous[1] != self.article.release_date
+
+
+class ArticleDiffer:
+    def __init__(self, seen_limit: int = SEEN_IDS_LIMIT):
+        """增量文章对比器
+
+        保存每篇文章的指纹(id -> (title, releaseDate))、有上限的已见id集合和发布时间高水位线,
+        每轮只遍历一次当前页面即可得到新增、修改和移除事件。
+
+        是否为新文章由已见id集合决定;高水位线只用作快速判断:
+        发布时间晚于所有已见文章的一定是新文章,无需查集合。
+        两个列表的文章共用一条高水位线,其他分类的文章可能把高水位线推到新上线公告之后,
+        因此不能用高水位线排除新文章。
+        """
+        self.fingerprints: Dict[Any, Fingerprint] = {}
+        self.sources: Dict[Any, str] = {}
+        self.seen: "OrderedDict[Any, None]" = OrderedDict()
+        self.seen_limit = seen_limit
+        self.watermark = 0
+        self.initialized = False
+
+    def diff(self, articles: Iterable[Article]) -> List[ArticleEvent]:
+        """对比当前页面与上一轮的结果
+
+        Args:
+            articles: 当前页面的文章,来源取自article.catalog
+
+        Returns:
+            变化事件列表,新增和修改事件按页面顺序排列,移除事件在最后
+        """
+        events: List[ArticleEvent] = []
+        fingerprints: Dict[Any, Fingerprint] = {}
+        sources: Dict[Any, str] = {}
+        seen = self.seen
+        watermark = self.watermark
+        added = 0
+
+        for article in articles:
+            article_id = article.id
+            if article_id in fingerprints:
+                # 同一篇文章可能同时出现在两个列表中
+                continue
+            release_date = article.release_date
+            fingerprint = article.fingerprint
+            fingerprints[article_id] = fingerprint
+            sources[article_id] = article.catalog
+            if release_date > watermark:
+                watermark = release_date
+
+            previous = self.fingerprints.get(article_id)
+            if previous is None:
+                added += 1
+                events.append(ArticleEvent(
+                    kind=ADDED,
+                    article_id=article_id,
+                    source=article.catalog,
+                    article=article,
+                    fresh=release_date > self.watermark or article_id not in seen,
+                ))
+            elif previous != fingerprint:
+                events.append(ArticleEvent(
+                    kind=CHANGED,
+                    article_id=article_id,
+                    source=article.catalog,
+                    article=article,
+                    previous=previous,
+                ))
+
+        # 所有旧文章都还在时无需扫描移除
+        if len(fingerprints) - added != len(self.fingerprints):
+            for article_id, previous in self.fingerprints.items():
+                if article_id not in fingerprints:
+                    events.append(ArticleEvent(
+                        kind=REMOVED,
+                        article_id=article_id,
+                        source=self.sources.get(article_id, ''),
+                        previous=previous,
+                    ))
+
+        # 当前页面上的文章移到最近位置,淘汰只影响早已不在页面上的id
+        for article_id in fingerprints:
+            seen[article_id] = None
+            seen.move_to_end(article_id)
+        while len(seen) > self.seen_limit:
+            seen.popitem(last=False)
+
+        self.fingerprints = fingerprints
+        self.sources = sources
+        self.watermark = watermark
+        self.initialized = True
+        return events
+
+    def has_title(self, title: str) -> bool:
+        """当前页面中是否已有该标题的文章"""
+        return any(fingerprint[0] == title for fingerprint in self.fingerprints.values())
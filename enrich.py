@@ -0,0 +1,185 @@
+import asyncio
+import json
+import re
+from typing import Optional, Dict, Any, List
+
+from article import Article, APP_DATA_PATTERN
+from breaker import get_breaker
+from config import ENRICH_WORKERS
+from rules import send_routed_message
+from util import (
+    DATA_DIR,
+    log_with_time,
+    fetch_and_save_html_content,
+)
+
+# 详情缓存文件
+ARTICLE_DETAILS_FILE = "article_details.json"
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+PAIR_PATTERN = re.compile(r'\b([A-Z0-9]{2,15}/(?:USDT|USDC|FDUSD|TUSD|BTC|ETH|BNB|TRY|EUR|BRL|JPY))\b')
+UTC_TIME = r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}(?::\d{2})?\s*\(UTC\))'
+LISTING_TIME_PATTERN = re.compile(r'trading\s+pairs?\s+at\s+' + UTC_TIME, re.IGNORECASE)
+ANY_TIME_PATTERN = re.compile(UTC_TIME)
+DEPOSIT_OPEN_PATTERN = re.compile(r'can\s+now\s+(?:start\s+)?deposit', re.IGNORECASE)
+DEPOSIT_TIME_PATTERN = re.compile(r'deposits?\b[^.]{0,120}?' + UTC_TIME, re.IGNORECASE)
+
+
+def _collect_text(node: Any, parts: List[str]) -> None:
+    """递归收集富文本节点树中的文本"""
+    if isinstance(node, dict):
+        if node.get('node') == 'text' and 'text' in node:
+            parts.append(node['text'])
+        for child in node.get('child', []):
+            _collect_text(child, parts)
+    elif isinstance(node, list):
+        for child in node:
+            _collect_text(child, parts)
+
+
+def _find_article_body(data: Any) -> Optional[str]:
+    """在APP_DATA中查找articleDetail的正文"""
+    if isinstance(data, dict):
+        detail = data.get('articleDetail')
+        if isinstance(detail, dict) and detail.get('body'):
+            return detail['body']
+        for value in data.values():
+            body = _find_article_body(value)
+            if body:
+                return body
+    elif isinstance(data, list):
+        for value in data:
+            body = _find_article_body(value)
+            if body:
+                return body
+    return None
+
+
+def extract_article_text(html_content: str) -> str:
+    """从详情页HTML中提取正文纯文本,找不到结构化正文时退回去除标签的HTML"""
+    match = APP_DATA_PATTERN.search(html_content)
+    if match:
+        try:
+            body = _find_article_body(json.loads(match.group(1)))
+            if body:
+                try:
+                    parts: List[str] = []
+                    _collect_text(json.loads(body), parts)
+                    return ' '.join(parts)
+                except (ValueError, TypeError):
+                    return TAG_PATTERN.sub(' ', body)
+        except ValueError:
+            pass
+    return TAG_PATTERN.sub(' ', html_content)
+
+
+def extract_article_details(text: str) -> Dict[str, Any]:
+    """从正文中提取交易对、上线时间和充值开放时间"""
+    pairs = list(dict.fromkeys(PAIR_PATTERN.findall(text)))
+
+    listing_time = None
+    match = LISTING_TIME_PATTERN.search(text) or ANY_TIME_PATTERN.search(text)
+    if match:
+        listing_time = match.group(1)
+
+    deposit_open = None
+    if DEPOSIT_OPEN_PATTERN.search(text):
+        deposit_open = "已开放"
+    else:
+        match = DEPOSIT_TIME_PATTERN.search(text)
+        if match:
+            deposit_open = match.group(1)
+
+    return {
+        'pairs': pairs,
+        'listing_time': listing_time,
+        'deposit_open': deposit_open,
+    }
+
+
+def build_details_message(title: str, details: Dict[str, Any]) -> Optional[str]:
+    """构建详情补充消息,没有任何可补充信息时返回None"""
+    lines = []
+    if details.get('pairs'):
+        lines.append(f"💱: {', '.join(details['pairs'])}")
+    if details.get('listing_time'):
+        lines.append(f"⏰ 上线时间: {details['listing_time']}")
+    if details.get('deposit_open'):
+        lines.append(f"📥 充值开放: {details['deposit_open']}")
+    if not lines:
+        return None
+    return "📋 公告详情补充\n" + f"📌: {title}\n" + "\n".join(lines)
+
+
+class ArticleEnricher:
+    def __init__(self, workers: int = ENRICH_WORKERS, cache_file: str = ARTICLE_DETAILS_FILE):
+        """文章详情补充器
+
+        新文章推送后提交到队列,由固定数量的工作协程抓取详情页并发送补充消息,
+        不会阻塞首条通知。结果按文章code缓存并持久化到文件。
+
+        Args:
+            workers: 工作协程数量
+            cache_file: 缓存文件名
+        """
+        self.workers = workers
+        self.cache_path = DATA_DIR / cache_file
+        self.cache: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._load_cache()
+
+    def _load_cache(self) -> None:
+        try:
+            if self.cache_path.exists():
+                self.cache = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except Exception as e:
+            log_with_time(f"❌ Failed to load article details cache: {e}")
+
+    def _save_cache(self) -> None:
+        try:
+            self.cache_path.write_text(json.dumps(self.cache, ensure_ascii=False), encoding='utf-8')
+        except Exception as e:
+            log_with_time(f"❌ Failed to save article details cache: {e}")
+
+    def start(self) -> None:
+        """启动工作协程,需在事件循环中调用"""
+        if self._tasks:
+            return
+        queue = asyncio.Queue()
+        self._queue = queue
+        self._tasks = [asyncio.create_task(self._worker(queue)) for _ in range(self.workers)]
+
+    def submit(self, article: Article) -> None:
+        """提交一篇文章等待补充详情,立即返回"""
+        self.start()
+        self._queue.put_nowait(article)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            article = await queue.get()
+            try:
+                await self.enrich(article)
+            except Exception as e:
+                log_with_time(f"❌ Error enriching article {article.code}: {e}")
+            finally:
+                queue.task_done()
+
+    async def enrich(self, article: Article) -> Optional[Dict[str, Any]]:
+        """抓取并解析文章详情,发送补充消息"""
+        code = article.code
+        details = self.cache.get(code)
+        if details is None:
+            # 详情页链接由标题推测,可能不存在,使用独立的熔断器避免影响列表轮询
+            html_content = await fetch_and_save_html_content(
+                article.link, None, max_retries=2, breaker=get_breaker('binance_detail'))
+            if html_content is None:
+                return None
+            details = extract_article_details(extract_article_text(html_content))
+            self.cache[code] = details
+            self._save_cache()
+
+        message = build_details_message(article.title, details)
+        if message:
+            await send_routed_message(article, message)
+        return details
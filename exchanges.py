@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Optional, Any, Dict, List
+
+from article import Article
+from config import PROXY_URL, USE_PROXY
+from source import Source
+from util import log_with_time, get_shared_session
+
+
+class JsonApiSource(Source):
+    """通过公开JSON接口获取公告的数据源,共用HTTP连接池和熔断器"""
+    url: str = ''
+    params: Dict[str, Any] = {}
+    headers: Dict[str, str] = {
+        'accept': 'application/json',
+        'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    }
+
+    async def fetch(self) -> Optional[Any]:
+        with self.breaker.request() as allowed:
+            if not allowed:
+                log_with_time(f"⛔ Circuit {self.breaker.name} is {self.breaker.state}, skipping request")
+                return None
+            proxy = PROXY_URL if USE_PROXY else None
+            try:
+                session = get_shared_session()
+                async with session.get(self.url, params=self.params, headers=self.headers, proxy=proxy) as response:
+                    if response.status != 200:
+                        self.breaker.record_failure()
+                        log_with_time(f"❌ [{self.name}] Request failed with status: {response.status}")
+                        return None
+                    data = await response.json(content_type=None)
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return data
+
+
+class OkxListingSource(JsonApiSource):
+    """OKX新币上线公告"""
+    name = 'okx'
+    url = 'https://www.okx.com/api/v5/support/announcements'
+    params = {'annType': 'announcements-new-listings'}
+
+    def parse(self, content: Any) -> List[Dict[str, Any]]:
+        return [item for page in content['data'] for item in page['details']]
+
+    def normalize(self, raw: Dict[str, Any]) -> Article:
+        return Article(raw['url'], '', raw['title'], int(raw['pTime']), 'OKX', url=raw['url'])
+
+
+class BybitListingSource(JsonApiSource):
+    """Bybit新币上线公告"""
+    name = 'bybit'
+    url = 'https://api.bybit.com/v5/announcements/index'
+    params = {'locale': 'en-US', 'type': 'new_crypto', 'limit': 20}
+
+    def parse(self, content: Any) -> List[Dict[str, Any]]:
+        return content['result']['list']
+
+    def normalize(self, raw: Dict[str, Any]) -> Article:
+        release_date = int(raw.get('publishTime') or raw['dateTimestamp'])
+        return Article(raw['url'], '', raw['title'], release_date, 'Bybit', url=raw['url'])
+
+
+class UpbitListingSource(JsonApiSource):
+    """Upbit交易相关公告"""
+    name = 'upbit'
+    url = 'https://api-manager.upbit.com/api/v1/announcements'
+    params = {'os': 'web', 'page': 1, 'per_page': 20, 'category': 'trade'}
+
+    def parse(self, content: Any) -> List[Dict[str, Any]]:
+        return content['data']['notices']
+
+    def normalize(self, raw: Dict[str, Any]) -> Article:
+        # listed_at为带时区的ISO时间,如 2024-03-12T10:00:00+09:00
+        release_date = int(datetime.fromisoformat(raw['listed_at']).timestamp() * 1000)
+        link = f"https://upbit.com/service_center/notice?id={raw['id']}"
+        return Article(f"upbit:{raw['id']}", '', raw['title'], release_date, 'Upbit', url=link)
+
+
+EXCHANGE_SOURCES = {
+    'okx': OkxListingSource,
+    'bybit': BybitListingSource,
+    'upbit': UpbitListingSource,
+}
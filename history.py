@@ -0,0 +1,196 @@
+import re
+import sqlite3
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Iterable
+
+from article import Article
+from config import HISTORY_API_HOST, HISTORY_API_PORT
+from emoji import get_emoji_and_type
+from util import DATA_DIR, log_with_time, build_article_link
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+HISTORY_DB_FILE = "history.db"
+
+# 标题中的代币符号: "Binance Will List Jupiter (JUP)"、"JUP/USDT"、"Will Delist ANT, MULTI and VAI"
+PAREN_SYMBOL_PATTERN = re.compile(r'\(([A-Z0-9]{2,15})\)')
+PAIR_SYMBOL_PATTERN = re.compile(r'\b([A-Z0-9]{2,15})/[A-Z]{2,6}\b')
+DELIST_PATTERN = re.compile(r'Delist\s+((?:[A-Z0-9]{2,15}(?:,\s*|\s+and\s+|\s*&\s*))*[A-Z0-9]{2,15})')
+DELIST_SPLIT_PATTERN = re.compile(r',\s*|\s+and\s+|\s*&\s*')
+# 形似代币符号但不是代币的词: 时区、网络/代币标准和常见缩写,如 "(UTC)"、"(BEP20)"
+NON_SYMBOL_WORDS = frozenset({
+    'UTC', 'GMT',
+    'BEP2', 'BEP20', 'ERC20', 'TRC20', 'SPL', 'BSC',
+    'API', 'APR', 'APY', 'AMA', 'ETF', 'FAQ', 'KYC', 'OTC', 'P2P', 'VIP',
+})
+
+MAX_PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    title TEXT NOT NULL,
+    release_date INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    catalog TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_release_date ON articles (release_date);
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category, release_date);
+CREATE TABLE IF NOT EXISTS article_symbols (
+    symbol TEXT NOT NULL,
+    article_id INTEGER NOT NULL,
+    PRIMARY KEY (symbol, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_article_symbols_article ON article_symbols (article_id);
+"""
+
+
+def extract_symbols(title: str) -> List[str]:
+    """从公告标题中提取代币符号,保持出现顺序并去重,排除NON_SYMBOL_WORDS中的词"""
+    symbols = PAREN_SYMBOL_PATTERN.findall(title)
+    symbols += PAIR_SYMBOL_PATTERN.findall(title)
+    for match in DELIST_PATTERN.finditer(title):
+        symbols += DELIST_SPLIT_PATTERN.split(match.group(1))
+    return [symbol for symbol in dict.fromkeys(symbols) if symbol not in NON_SYMBOL_WORDS]
+
+
+class ArticleStore:
+    def __init__(self, db_file: str = HISTORY_DB_FILE):
+        """公告历史存储
+
+        基于SQLite,文章表按发布时间和分类建索引,
+        代币符号单独建倒排表(symbol -> article_id)。
+        """
+        self.db_path = DATA_DIR / db_file
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def record(self, articles: Iterable[Article]) -> None:
+        """写入或更新文章及其代币符号索引"""
+        with self.conn:
+            for article in articles:
+                _, category = get_emoji_and_type(article.title)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO articles (id, code, title, release_date, category, catalog) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (article.id, article.code, article.title,
+                     article.release_date, category, article.catalog),
+                )
+                self.conn.execute("DELETE FROM article_symbols WHERE article_id = ?", (article.id,))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO article_symbols (symbol, article_id) VALUES (?, ?)",
+                    [(symbol, article.id) for symbol in extract_symbols(article.title)],
+                )
+
+    def query(self,
+              symbol: Optional[str] = None,
+              category: Optional[str] = None,
+              start: Optional[int] = None,
+              end: Optional[int] = None,
+              page: int = 1,
+              page_size: int = 20) -> Dict[str, Any]:
+        """按代币符号、分类和时间范围分页查询,结果按发布时间倒序
+
+        Args:
+            symbol: 代币符号
+            category: 公告分类,取值见emoji.ANNOUNCEMENT_MAPPINGS
+            start: 起始时间(毫秒时间戳,含)
+            end: 结束时间(毫秒时间戳,不含)
+            page: 页码,从1开始
+            page_size: 每页数量
+        """
+        joins = ""
+        conditions = []
+        params: List[Any] = []
+        if symbol:
+            joins = "JOIN article_symbols s ON s.article_id = a.id"
+            conditions.append("s.symbol = ?")
+            params.append(symbol.upper())
+        if category:
+            conditions.append("a.category = ?")
+            params.append(category)
+        if start is not None:
+            conditions.append("a.release_date >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("a.release_date < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        total = self.conn.execute(
+            f"SELECT COUNT(*) FROM articles a {joins} {where}", params
+        ).fetchone()[0]
+        rows = self.conn.execute(
+            f"SELECT a.*, (SELECT group_concat(symbol) FROM article_symbols WHERE article_id = a.id) AS symbols "
+            f"FROM articles a {joins} {where} "
+            f"ORDER BY a.release_date DESC LIMIT ? OFFSET ?",
+            params + [page_size, (page - 1) * page_size],
+        ).fetchall()
+
+        items = []
+        for row in rows:
+            items.append({
+                'id': row['id'],
+                'code': row['code'],
+                'title': row['title'],
+                'releaseDate': row['release_date'],
+                'category': row['category'],
+                'catalog': row['catalog'],
+                'symbols': row['symbols'].split(',') if row['symbols'] else [],
+                'link': build_article_link(row['title'], row['code']),
+            })
+        return {'total': total, 'page': page, 'page_size': page_size, 'items': items}
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _parse_time(value: Optional[str]) -> Optional[int]:
+    """解析查询参数中的时间,支持毫秒时间戳或YYYY-MM-DD"""
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    return int(datetime.strptime(value, '%Y-%m-%d').timestamp() * 1000)
+
+
+async def handle_articles(request: 'web.Request') -> 'web.Response':
+    """GET /articles?symbol=&category=&start=&end=&page=&page_size="""
+    from aiohttp import web
+    params = request.query
+    try:
+        result = request.app['store'].query(
+            symbol=params.get('symbol'),
+            category=params.get('category'),
+            start=_parse_time(params.get('start')),
+            end=_parse_time(params.get('end')),
+            page=int(params.get('page', 1)),
+            page_size=int(params.get('page_size', 20)),
+        )
+    except ValueError as e:
+        return web.json_response({'error': str(e)}, status=400)
+    return web.json_response(result)
+
+
+async def start_history_api(store: ArticleStore,
+                            host: str = HISTORY_API_HOST,
+                            port: int = HISTORY_API_PORT) -> 'web.AppRunner':
+    """在当前事件循环中启动本地查询接口"""
+    # aiohttp.web只在启用查询接口时导入
+    from aiohttp import web
+    app = web.Application()
+    app['store'] = store
+    app.router.add_get('/articles', handle_articles)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log_with_time(f"🟢 History API listening on http://{host}:{port}/articles")
+    return runner
+
+
+article_store = ArticleStore()
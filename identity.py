@@ -0,0 +1,171 @@
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from cookie import CookieManager
+from config import IDENTITY_POOL_SIZE, IDENTITY_PROXIES
+
+# 浏览器指纹配置: User-Agent必须与客户端提示(sec-ch-ua等)相互匹配,
+# 并且只使用Chromium内核的UA,与Playwright生成cookie时的浏览器保持一致
+BROWSER_PROFILES = [
+    {
+        'user_agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        'sec_ch_ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+        'platform': '"Windows"',
+    },
+    {
+        'user_agent': "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        'sec_ch_ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+        'platform': '"macOS"',
+    },
+    {
+        'user_agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+        'sec_ch_ua': '"Google Chrome";v="119", "Chromium";v="119", "Not?A_Brand";v="24"',
+        'platform': '"Windows"',
+    },
+    {
+        'user_agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+        'sec_ch_ua': '"Not_A Brand";v="8", "Chromium";v="120", "Microsoft Edge";v="120"',
+        'platform': '"Windows"',
+    },
+]
+
+IDENTITY_DIR = Path("data") / "identities"
+
+# 健康分数相关配置
+HEALTH_DECAY = 0.7  # 指数加权平均中旧分数的权重
+HEALTH_FLOOR = 0.2  # 低于该分数的身份在冷却期内不会被选中
+COOLDOWN_SECONDS = 300  # 不健康身份的冷却时间(秒)
+HEALTH_RECOVERY_SECONDS = 1800  # 闲置身份的分数从0线性恢复到1.0所需的时间(秒)
+
+
+@dataclass
+class Identity:
+    """一个请求身份: cookie + 匹配的浏览器指纹 + 出口代理"""
+    name: str
+    user_agent: str
+    sec_ch_ua: str
+    platform: str
+    proxy: Optional[str] = None
+    score: float = 1.0
+    score_updated_at: float = 0.0
+    last_used: float = 0.0
+    cooldown_until: float = 0.0
+    cookie_manager: CookieManager = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.cookie_manager = CookieManager(str(IDENTITY_DIR / f"cookies_{self.name}.txt"))
+
+    def client_hints(self) -> Dict[str, str]:
+        """返回与User-Agent匹配的客户端提示请求头"""
+        return {
+            'sec-ch-ua': self.sec_ch_ua,
+            'sec-ch-ua-mobile': '?0',
+            'sec-ch-ua-platform': self.platform,
+        }
+
+    def get_cookies(self) -> Optional[str]:
+        return self.cookie_manager.get_cookies()
+
+    async def refresh_cookies(self) -> str:
+        """使用与该身份相同的UA、客户端提示和出口重新生成cookie"""
+        return await self.cookie_manager.update_cookies(
+            user_agent=self.user_agent,
+            proxy=self.proxy,
+            extra_headers=self.client_hints(),
+        )
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def recover(self, now: float) -> None:
+        """按距离上次更新分数的时间,把分数线性恢复到1.0
+
+        分数只在使用时更新,被挑战过的身份如果没有恢复,就再也不会被选中来证明自己已经恢复
+        """
+        elapsed = max(0.0, now - self.score_updated_at)
+        self.score = min(1.0, self.score + elapsed / HEALTH_RECOVERY_SECONDS)
+        self.score_updated_at = now
+
+
+class IdentityPool:
+    def __init__(self, size: int = IDENTITY_POOL_SIZE, proxies: Optional[List[Optional[str]]] = None):
+        """初始化身份池
+
+        Args:
+            size: 身份数量
+            proxies: 出口代理列表,按顺序循环分配
+        """
+        proxies = proxies or IDENTITY_PROXIES or [None]
+        now = time.time()
+        self.state_file = IDENTITY_DIR / "pool_state.json"
+        self.identities: List[Identity] = []
+        for i in range(size):
+            profile = BROWSER_PROFILES[i % len(BROWSER_PROFILES)]
+            self.identities.append(Identity(
+                name=str(i),
+                user_agent=profile['user_agent'],
+                sec_ch_ua=profile['sec_ch_ua'],
+                platform=profile['platform'],
+                proxy=proxies[i % len(proxies)],
+                score_updated_at=now,
+            ))
+        self._load_state()
+
+    def _load_state(self) -> None:
+        """从文件加载各身份的健康分数及其更新时间,停机期间的时间同样计入恢复"""
+        try:
+            if self.state_file.exists():
+                state = json.loads(self.state_file.read_text())
+                for identity in self.identities:
+                    if identity.name in state:
+                        saved = state[identity.name]
+                        identity.score = saved.get('score', identity.score)
+                        identity.score_updated_at = saved.get('updated_at', identity.score_updated_at)
+        except Exception as e:
+            self._log(f"❌ Failed to load identity pool state: {e}")
+
+    def _save_state(self) -> None:
+        """保存各身份的健康分数到文件"""
+        try:
+            state = {
+                identity.name: {'score': identity.score, 'updated_at': identity.score_updated_at}
+                for identity in self.identities
+            }
+            IDENTITY_DIR.mkdir(parents=True, exist_ok=True)
+            self.state_file.write_text(json.dumps(state))
+        except Exception as e:
+            self._log(f"❌ Failed to save identity pool state: {e}")
+
+    def acquire(self) -> Identity:
+        """按健康分数选择身份,分数相同时优先选择最久未使用的"""
+        now = time.time()
+        for identity in self.identities:
+            identity.recover(now)
+        candidates = [i for i in self.identities if i.is_available(now)] or self.identities
+        identity = max(candidates, key=lambda i: (i.score, -i.last_used))
+        identity.last_used = now
+        return identity
+
+    def report_success(self, identity: Identity) -> None:
+        """记录一次成功请求"""
+        self._update_score(identity, 1.0)
+
+    def report_challenge(self, identity: Identity) -> None:
+        """记录一次被挑战(202)或失败的请求"""
+        self._update_score(identity, 0.0)
+        if identity.score < HEALTH_FLOOR:
+            identity.cooldown_until = time.time() + COOLDOWN_SECONDS
+            self._log(f"🧊 Identity {identity.name} unhealthy (score {identity.score:.2f}), cooling down")
+
+    def _update_score(self, identity: Identity, outcome: float) -> None:
+        identity.recover(time.time())
+        identity.score = HEALTH_DECAY * identity.score + (1 - HEALTH_DECAY) * outcome
+        self._save_state()
+
+    def _log(self, message: str) -> None:
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{current_time}] {message}")
@@ -1,8 +1,18 @@
+import startup
 import asyncio
 import binanceListing
-import coinglass
+import history
+import source
+from breaker import get_breaker
+from util import send_breaker_alerts, close_sessions
 from datetime import datetime
-from config import ENABLE_COINGLASS, COINGLASS_FILE_INTERVAL
+from config import (
+    ENABLE_COINGLASS,
+    COINGLASS_FILE_INTERVAL,
+    ENABLE_HISTORY_API,
+    ENABLE_MEMORY_WATCHDOG,
+    ENABLED_SOURCES,
+)
 def log_with_time(message):
     """打印带时间戳的消息"""
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -12,44 +22,135 @@ async def run_coinglass_monitor():
     """运行 Coinglass 监控"""
     if not ENABLE_COINGLASS:
         return
+    # coinglass依赖playwright,只在启用时导入,并推迟到首次公告轮询之后
+    await startup.wait_first_poll()
+    coinglass = startup.lazy_import('coinglass')
+    breaker = get_breaker('coinglass')
     while True:
-        scraper = coinglass.CoinglassScraper()
+        with breaker.request() as allowed:
+            if not allowed:
+                await asyncio.sleep(60)
+                continue
+            scraper = coinglass.CoinglassScraper()
+            succeeded = False
+            try:
+                await scraper._initialize()
+                log_with_time("🟢 开始 Coinglass 指标监控...")
+                succeeded = await scraper._download_and_send_image()
+            except Exception as e:
+                log_with_time(f"❌ Coinglass 监控错误: {e}")
+            finally:
+                await scraper._close()
+
+            if succeeded:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
         try:
-            await scraper._initialize()
-            log_with_time("🟢 开始 Coinglass 指标监控...")
-            await scraper._download_and_send_image()
+            await send_breaker_alerts()
+        except Exception as e:
+            log_with_time(f"❌ 发送熔断告警失败: {e}")
+
+        if succeeded:
             log_with_time(f"🟢 Coinglass 监控完成,等待 {COINGLASS_FILE_INTERVAL} 秒后重新检查...")
             await asyncio.sleep(COINGLASS_FILE_INTERVAL)
-        except Exception as e:
-            log_with_time(f"❌ Coinglass 监控错误: {e}")
+        else:
             await asyncio.sleep(60)
-        finally:
-            await scraper._close()
+
+# 主监控出错后重启前的等待时间(秒)
+MONITOR_RESTART_DELAY = 60
+
+history_api_runner = None
+memory_watchdog_task = None
+services_task = None
+sources = None
+
+def build_sources():
+    """按配置创建公告数据源,只创建一次,监控重启时保留去重状态"""
+    global sources
+    if sources is None:
+        sources = []
+        for name in ENABLED_SOURCES:
+            if name == 'binance':
+                sources.append(binanceListing.binance_source)
+                continue
+            # 其他交易所的数据源按需导入
+            exchanges = startup.lazy_import('exchanges')
+            if name not in exchanges.EXCHANGE_SOURCES:
+                log_with_time(f"❌ 未知的数据源: {name}")
+                continue
+            sources.append(exchanges.EXCHANGE_SOURCES[name]())
+    return sources
+
+def start_memory_watchdog():
+    """启动内存监控并注册可重启的子系统: HTTP连接池,以及cookie刷新和Coinglass使用的Playwright/Chromium"""
+    global memory_watchdog_task
+    if memory_watchdog_task is not None:
+        return
+    memwatch = startup.lazy_import('memwatch')
+    cookie = startup.lazy_import('cookie')
+    watchdog = memwatch.memory_watchdog
+    watchdog.register('http_sessions', close_sessions)
+    watchdog.register('cookie_browsers', cookie.close_browsers)
+    if ENABLE_COINGLASS:
+        coinglass = startup.lazy_import('coinglass')
+        watchdog.register('coinglass_browser', coinglass.close_scrapers)
+    memory_watchdog_task = asyncio.create_task(watchdog.run())
+
+async def start_services():
+    """首次公告轮询完成后启动查询接口和内存监控,启动失败只记录日志,不影响公告监控"""
+    global history_api_runner
+    await startup.wait_first_poll()
+    # 查询接口只启动一次,监控重启时复用
+    if ENABLE_HISTORY_API and history_api_runner is None:
+        try:
+            history_api_runner = await history.start_history_api(history.article_store)
+        except Exception as e:
+            log_with_time(f"❌ 历史查询接口启动失败: {e}")
+    if ENABLE_MEMORY_WATCHDOG:
+        try:
+            start_memory_watchdog()
+        except Exception as e:
+            log_with_time(f"❌ 内存监控启动失败: {e}")
 
 async def run_all_monitors():
-    """并发运行所有监控任务"""
-    try:
+    """并发运行所有监控任务,出错时先取消仍在运行的任务,等待一段时间后重新创建"""
+    global services_task
+    if services_task is None:
+        services_task = asyncio.create_task(start_services())
+    while True:
         # 创建监控任务
-        listing_task = asyncio.create_task(binanceListing.monitor())
-        coinglass_task = asyncio.create_task(run_coinglass_monitor())
-        
+        tasks = [
+            asyncio.create_task(source.run_sources(build_sources())),
+            asyncio.create_task(run_coinglass_monitor()),
+        ]
         log_with_time("🟢 所有监控任务启动成功")
-        
-        # 等待所有任务完成
-        await asyncio.gather(
-            listing_task,
-            coinglass_task
-        )
-    except Exception as e:
-        log_with_time(f"❌ 主监控错误: {e}")
+        try:
+            # 等待所有任务完成
+            await asyncio.gather(*tasks)
+            return
+        except Exception as e:
+            log_with_time(f"❌ 主监控错误: {e}")
+        finally:
+            # 重启前取消旧任务,避免同一数据源被多组任务同时轮询
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
         # 如果发生错误,等待一段时间后重启
-        await asyncio.sleep(60)
+        await asyncio.sleep(MONITOR_RESTART_DELAY)
+
+async def main():
+    """运行所有监控,退出时关闭HTTP会话"""
+    try:
         await run_all_monitors()
+    finally:
+        await close_sessions()
 
 if __name__ == "__main__":
+    startup.mark('imports')
     log_with_time("🟢 启动币安公告监控系统...")
     try:
-        asyncio.run(run_all_monitors())
+        asyncio.run(main())
     except KeyboardInterrupt:
         log_with_time("🟢 监控系统被用户停止")
     except Exception as e:
@@ -0,0 +1,164 @@
+import asyncio
+import gc
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter, deque
+from typing import Optional, Dict, List, Tuple, Callable, Awaitable
+
+from config import (
+    MEMORY_WATCHDOG_INTERVAL,
+    MEMORY_RSS_LIMIT_MB,
+    MEMORY_GROWTH_LIMIT_MB_PER_HOUR,
+)
+from util import log_with_time
+
+TOP_ALLOCATORS = 10  # 每次输出的分配热点数量
+TOP_TYPES = 10  # 每次输出的对象类型数量
+TREND_SAMPLES = 12  # 计算增长趋势使用的采样数
+RESTART_COOLDOWN = 60 * 60  # 同一子系统两次重启的最小间隔(秒)
+
+# 重启钩子返回是否实际释放了资源,没有可释放的资源时不计入冷却
+RestartHook = Callable[[], Awaitable[bool]]
+
+
+def read_rss_mb() -> float:
+    """读取当前进程的RSS(MB),非Linux环境退回峰值RSS"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS返回字节,Linux返回KB
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def count_objects_by_type() -> Counter:
+    """统计gc跟踪的对象数量(按类型名)"""
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def growth_rate_mb_per_hour(samples: List[Tuple[float, float]]) -> float:
+    """对(时间, RSS)采样做最小二乘拟合,返回每小时增长的MB数"""
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_m = sum(m for _, m in samples) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in samples)
+    if var_t == 0:
+        return 0.0
+    slope = sum((t - mean_t) * (m - mean_m) for t, m in samples) / var_t
+    return slope * 3600
+
+
+class MemoryWatchdog:
+    def __init__(self,
+                 interval: float = MEMORY_WATCHDOG_INTERVAL,
+                 rss_limit_mb: float = MEMORY_RSS_LIMIT_MB,
+                 growth_limit_mb_per_hour: float = MEMORY_GROWTH_LIMIT_MB_PER_HOUR):
+        """内存增长监控
+
+        定期采样RSS、tracemalloc分配热点和按类型的对象数量,输出增长趋势;
+        RSS或增长速率超过阈值时按注册顺序重启子系统。
+        """
+        self.interval = interval
+        self.rss_limit_mb = rss_limit_mb
+        self.growth_limit_mb_per_hour = growth_limit_mb_per_hour
+        self.samples: deque = deque(maxlen=TREND_SAMPLES)
+        self.hooks: Dict[str, RestartHook] = {}
+        self.last_restart: Dict[str, float] = {}
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._type_counts: Optional[Counter] = None
+
+    def register(self, name: str, restart: RestartHook) -> None:
+        """注册一个可重启的子系统"""
+        self.hooks[name] = restart
+
+    async def run(self) -> None:
+        """循环采样,需在事件循环中以任务方式运行"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        log_with_time(f"🟢 Memory watchdog started, interval {self.interval}s")
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                log_with_time(f"❌ Memory watchdog error: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def check(self) -> None:
+        """执行一次采样并在需要时重启子系统"""
+        rss = read_rss_mb()
+        self.samples.append((time.time(), rss))
+        rate = growth_rate_mb_per_hour(list(self.samples))
+        log_with_time(f"🧠 RSS {rss:.1f} MB, trend {rate:+.1f} MB/h over {len(self.samples)} samples")
+
+        self._log_allocators()
+        self._log_type_growth()
+
+        over_limit = rss > self.rss_limit_mb
+        growing = len(self.samples) == self.samples.maxlen and rate > self.growth_limit_mb_per_hour
+        if over_limit or growing:
+            reason = f"RSS {rss:.1f} MB > {self.rss_limit_mb} MB" if over_limit else \
+                f"growth {rate:.1f} MB/h > {self.growth_limit_mb_per_hour} MB/h"
+            await self.restart_subsystems(reason)
+
+    def _log_allocators(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if self._snapshot is None:
+            stats = snapshot.statistics('lineno')[:TOP_ALLOCATORS]
+            lines = [f"    {stat}" for stat in stats]
+            title = "top allocators"
+        else:
+            stats = snapshot.compare_to(self._snapshot, 'lineno')[:TOP_ALLOCATORS]
+            lines = [f"    {stat}" for stat in stats if stat.size_diff > 0]
+            title = "allocation growth since last check"
+        self._snapshot = snapshot
+        if lines:
+            log_with_time(f"🧠 {title}:\n" + "\n".join(lines))
+
+    def _log_type_growth(self) -> None:
+        counts = count_objects_by_type()
+        if self._type_counts is not None:
+            growth = counts.copy()
+            growth.subtract(self._type_counts)
+            lines = [f"    {name}: {counts[name]} ({diff:+d})"
+                     for name, diff in growth.most_common(TOP_TYPES) if diff > 0]
+            if lines:
+                log_with_time("🧠 object count growth since last check:\n" + "\n".join(lines))
+        self._type_counts = counts
+
+    async def restart_subsystems(self, reason: str) -> None:
+        """按注册顺序重启处于冷却期之外的子系统,有子系统重启时重新开始采样"""
+        now = time.time()
+        restarted = False
+        for name, restart in self.hooks.items():
+            last = self.last_restart.get(name)
+            if last is not None and now - last < RESTART_COOLDOWN:
+                continue
+            try:
+                released = await restart()
+            except Exception as e:
+                self.last_restart[name] = now
+                log_with_time(f"❌ Failed to restart subsystem {name}: {e}")
+                continue
+            if released:
+                self.last_restart[name] = now
+                restarted = True
+                log_with_time(f"♻️ Restarted subsystem {name}: {reason}")
+        if not restarted:
+            log_with_time(f"🧠 {reason}, no subsystem to restart")
+            return
+        gc.collect()
+        self.samples.clear()
+
+
+memory_watchdog = MemoryWatchdog()
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import sys
+import time
+import uuid
+from typing import Optional, Dict, Any, Callable, Awaitable
+from urllib.parse import urlencode
+
+import aiohttp
+
+from article import Article
+from config import (
+    BINANCE_API_KEY,
+    BINANCE_API_SECRET,
+    PUSH_WS_URL,
+    PUSH_TOPIC,
+    PROXY_URL,
+    USE_PROXY,
+)
+from util import log_with_time
+
+HEARTBEAT_INTERVAL = 30  # 心跳间隔(秒),超过该时间未收到pong时断开重连
+RECONNECT_BASE_DELAY = 1  # 重连初始等待(秒)
+RECONNECT_MAX_DELAY = 60  # 重连最大等待(秒)
+
+ArticleHandler = Callable[[Article], Awaitable[None]]
+
+
+def build_stream_url(base_url: str = PUSH_WS_URL,
+                     api_key: Optional[str] = BINANCE_API_KEY,
+                     api_secret: Optional[str] = BINANCE_API_SECRET,
+                     topic: str = PUSH_TOPIC) -> str:
+    """构建带签名的推送地址,未配置密钥时(如本地测试服务)直接返回原地址"""
+    if not (api_key and api_secret):
+        return base_url
+    params = {
+        'random': uuid.uuid4().hex,
+        'topic': topic,
+        'recvWindow': 30000,
+        'timestamp': int(time.time() * 1000),
+    }
+    query = urlencode(params)
+    signature = hmac.new(api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+    return f"{base_url}?{query}&signature={signature}"
+
+
+def parse_push_message(payload: Dict[str, Any]) -> Optional[Article]:
+    """将推送消息转换为Article,非公告数据返回None
+
+    推送数据不包含文章id和code,id使用标题代替,链接在轮询确认后补全。
+    """
+    if payload.get('type') != 'DATA':
+        return None
+    data = payload.get('data')
+    if isinstance(data, str):
+        data = json.loads(data)
+    if not isinstance(data, dict) or not data.get('title'):
+        return None
+    return Article(
+        id=data['title'],
+        code='',
+        title=data['title'],
+        release_date=data.get('publishDate', int(time.time() * 1000)),
+        catalog=data.get('catalogName', 'Push'),
+    )
+
+
+class AnnouncementStream:
+    def __init__(self, on_article: ArticleHandler, url: Optional[str] = None):
+        """币安公告WebSocket推送源
+
+        自动重连(指数退避)、心跳检测,并在每次连接后重新订阅主题。
+
+        Args:
+            on_article: 收到公告时的回调
+            url: 推送地址,为空时使用配置并签名,可指向本地测试服务
+        """
+        self.on_article = on_article
+        self.url = url
+        self.connected = False
+        self._disconnected = asyncio.Event()
+        self._disconnected.set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.connected
+
+    def start(self) -> None:
+        """在当前事件循环中启动推送任务"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def wait_disconnected(self, timeout: float) -> None:
+        """等待连接断开,最多等待timeout秒"""
+        try:
+            await asyncio.wait_for(self._disconnected.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self) -> None:
+        """保持连接,断开后按指数退避重连"""
+        delay = RECONNECT_BASE_DELAY
+        while True:
+            try:
+                await self._connect_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_with_time(f"🔴 Push stream error: {e}")
+            finally:
+                # 本轮连接成功过时,无论之后正常关闭还是出错,都从初始退避时间开始重连
+                if self.connected:
+                    delay = RECONNECT_BASE_DELAY
+                self._set_connected(False)
+            wait = delay + random.uniform(0, delay / 2)
+            log_with_time(f"🔄 Push stream reconnecting in {wait:.1f}s")
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _connect_once(self) -> None:
+        url = self.url or build_stream_url()
+        headers = {'X-MBX-APIKEY': BINANCE_API_KEY} if BINANCE_API_KEY and not self.url else {}
+        proxy = PROXY_URL if USE_PROXY and not self.url else None
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(url, headers=headers, proxy=proxy,
+                                          heartbeat=HEARTBEAT_INTERVAL) as ws:
+                await ws.send_json({'command': 'SUBSCRIBE', 'value': PUSH_TOPIC})
+                self._set_connected(True)
+                log_with_time(f"🟢 Push stream connected, subscribed to {PUSH_TOPIC}")
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        await self._handle_text(msg.data)
+                    elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+                log_with_time(f"🔴 Push stream closed: {ws.close_code}")
+
+    async def _handle_text(self, text: str) -> None:
+        try:
+            article = parse_push_message(json.loads(text))
+        except ValueError as e:
+            log_with_time(f"🔴 Invalid push message: {e}")
+            return
+        if article is None:
+            return
+        try:
+            await self.on_article(article)
+        except Exception as e:
+            log_with_time(f"🔴 Error handling pushed article: {e}")
+
+    def _set_connected(self, connected: bool) -> None:
+        self.connected = connected
+        if connected:
+            self._disconnected.clear()
+        else:
+            self._disconnected.set()
+
+
+if __name__ == "__main__":
+    # 连接推送源并打印收到的公告,可传入本地测试服务地址: python push.py ws://127.0.0.1:8765
+    async def print_article(article: Article) -> None:
+        log_with_time(f"📨 [{article.catalog}] {article.title}")
+
+    async def main():
+        stream = AnnouncementStream(print_article, url=sys.argv[1] if len(sys.argv) > 1 else None)
+        await stream.run()
+
+    asyncio.run(main())
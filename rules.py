@@ -0,0 +1,201 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Pattern, Tuple
+
+from article import Article
+from config import RULES_FILE, WEBHOOK_URL, NOTIFY_FORMAT
+from emoji import get_emoji_and_type
+from history import extract_symbols
+from templates import FORMATS, render_article
+from util import log_with_time, send_message_async
+
+WEBHOOK_URL_TEMPLATE = 'https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key={}'
+
+
+@dataclass
+class Channel:
+    """一个推送目标及其订阅条件,同一维度内任一值命中即可,各维度之间需同时满足"""
+    name: str
+    webhook_url: str
+    categories: List[str]
+    symbols: List[str]
+    catalogs: List[str]
+    keywords: List[str]
+    patterns: List[str]
+    format: str = NOTIFY_FORMAT
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Channel':
+        """从规则文件中的一项构建频道,正则或消息格式无效时抛出ValueError"""
+        name = config['name']
+        webhook_url = config.get('webhook_url')
+        if not webhook_url:
+            webhook_url = WEBHOOK_URL_TEMPLATE.format(config['webhook_key'])
+        patterns = config.get('patterns', [])
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"invalid pattern {pattern!r} in channel {name!r}: {e}") from e
+        msgtype = config.get('format', NOTIFY_FORMAT)
+        if msgtype not in FORMATS:
+            raise ValueError(f"invalid format {msgtype!r} in channel {name!r}, expected one of {', '.join(FORMATS)}")
+        return cls(
+            name=name,
+            webhook_url=webhook_url,
+            categories=config.get('categories', []),
+            symbols=[symbol.upper() for symbol in config.get('symbols', [])],
+            catalogs=config.get('catalogs', []),
+            keywords=config.get('keywords', []),
+            patterns=patterns,
+            format=msgtype,
+        )
+
+
+class CompiledRules:
+    def __init__(self, channels: List[Channel]):
+        """将所有频道的订阅条件编译为一个匹配器
+
+        分类、代币符号和来源各建一张 值 -> 频道位图 的索引;
+        关键词合并为一个正则,每个关键词对应一个命名分组(用前瞻保证各关键词独立匹配)。
+        用户正则可能带有全局标志、反向引用或命名分组,合并后会出错或含义改变,因此各自单独编译,
+        并且只对其他维度已命中的频道执行。
+        匹配时每个维度各查一次,再对位图做按位与。
+        """
+        self.channels = channels
+        all_mask = (1 << len(channels)) - 1
+
+        self.category_index: Dict[str, int] = {}
+        self.symbol_index: Dict[str, int] = {}
+        self.catalog_index: Dict[str, int] = {}
+        # 未设置某维度条件的频道在该维度视为全部命中
+        self.category_any = all_mask
+        self.symbol_any = all_mask
+        self.catalog_any = all_mask
+        self.text_any = all_mask
+
+        self.group_masks: Dict[str, int] = {}
+        self.patterns: List[Tuple[Pattern, int]] = []
+        lookaheads: List[str] = []
+
+        for i, channel in enumerate(channels):
+            bit = 1 << i
+            for values, index, any_attr in (
+                (channel.categories, self.category_index, 'category_any'),
+                (channel.symbols, self.symbol_index, 'symbol_any'),
+                (channel.catalogs, self.catalog_index, 'catalog_any'),
+            ):
+                if values:
+                    setattr(self, any_attr, getattr(self, any_attr) & ~bit)
+                    for value in values:
+                        index[value] = index.get(value, 0) | bit
+
+            if channel.keywords or channel.patterns:
+                self.text_any &= ~bit
+            for keyword in channel.keywords:
+                group = f"k{len(lookaheads)}"
+                lookaheads.append(f"(?=.*?(?P<{group}>(?i:{re.escape(keyword)})))?")
+                self.group_masks[group] = bit
+            for pattern in channel.patterns:
+                self.patterns.append((re.compile(pattern), bit))
+
+        self.keyword_pattern: Optional[Pattern] = re.compile(''.join(lookaheads), re.DOTALL) if lookaheads else None
+
+    def match(self, article: Article) -> List[Channel]:
+        """返回订阅了该文章的频道"""
+        if not self.channels:
+            return []
+        _, category = get_emoji_and_type(article.title)
+        mask = self.category_any | self.category_index.get(category, 0)
+        mask &= self.catalog_any | self.catalog_index.get(article.catalog, 0)
+        if not mask:
+            return []
+
+        symbol_mask = self.symbol_any
+        if self.symbol_index:
+            for symbol in extract_symbols(article.title):
+                symbol_mask |= self.symbol_index.get(symbol, 0)
+        mask &= symbol_mask
+        if not mask:
+            return []
+
+        text_mask = self.text_any
+        if self.keyword_pattern is not None:
+            for group, value in self.keyword_pattern.match(article.title).groupdict().items():
+                if value is not None:
+                    text_mask |= self.group_masks[group]
+        for pattern, bit in self.patterns:
+            # 其他维度未命中或已被关键词命中的频道无需再执行正则
+            if mask & bit and not text_mask & bit and pattern.search(article.title):
+                text_mask |= bit
+        mask &= text_mask
+
+        return [channel for i, channel in enumerate(self.channels) if mask >> i & 1]
+
+
+class RuleEngine:
+    def __init__(self, rules_file: str = RULES_FILE):
+        """订阅路由规则,规则文件修改后在下次匹配时自动重新编译"""
+        self.rules_path = Path(rules_file)
+        self.include_default = True
+        self.rules = CompiledRules([])
+        self._mtime: Optional[float] = None
+
+    def maybe_reload(self) -> None:
+        """规则文件有变化时重新加载,加载失败时保留原规则"""
+        try:
+            mtime = os.stat(self.rules_path).st_mtime
+        except FileNotFoundError:
+            if self._mtime is not None:
+                log_with_time(f"🔵 Rules file {self.rules_path} removed, routing to default webhook only")
+                self.include_default = True
+                self.rules = CompiledRules([])
+                self._mtime = None
+            return
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            config = json.loads(self.rules_path.read_text(encoding='utf-8'))
+            channels = []
+            for channel_config in config.get('channels', []):
+                try:
+                    channels.append(Channel.from_config(channel_config))
+                except ValueError as e:
+                    # 单个频道配置错误时跳过该频道,其他频道正常加载
+                    log_with_time(f"❌ Skipping channel in {self.rules_path}: {e}")
+            self.rules = CompiledRules(channels)
+            self.include_default = config.get('include_default', True)
+            log_with_time(f"🟢 Loaded {len(channels)} routing channels from {self.rules_path}")
+        except Exception as e:
+            log_with_time(f"❌ Failed to load rules from {self.rules_path}, keeping previous rules: {e}")
+
+    def targets(self, article: Article) -> List[Tuple[str, str]]:
+        """返回文章需要推送到的 (webhook地址, 消息格式),按地址去重"""
+        self.maybe_reload()
+        targets = {WEBHOOK_URL: NOTIFY_FORMAT} if self.include_default else {}
+        for channel in self.rules.match(article):
+            targets.setdefault(channel.webhook_url, channel.format)
+        return list(targets.items())
+
+
+rule_engine = RuleEngine()
+
+
+async def send_routed_message(article: Article, message: Optional[str] = None, prefix: str = '') -> None:
+    """按订阅规则将文章相关消息推送到所有匹配的频道
+
+    Args:
+        article: 文章
+        message: 自定义文本消息,为空时使用各频道格式的预渲染文章消息
+        prefix: 添加在消息前的文本
+    """
+    for webhook_url, msgtype in rule_engine.targets(article):
+        if message is None:
+            rendered = render_article(article, msgtype)
+            await send_message_async(prefix + rendered.content, webhook_url, rendered.msgtype)
+        else:
+            await send_message_async(prefix + message, webhook_url)
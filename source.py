@@ -0,0 +1,133 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional, Any, List
+
+import startup
+from article import Article
+from breaker import BREAKERS, CircuitBreaker
+from config import MONITOR_INTERVAL
+from differ import ArticleDiffer, ArticleEvent, ADDED
+from rules import send_routed_message
+from util import log_with_time, send_breaker_alerts, flush_pending_messages
+
+
+@dataclass
+class SourceMetrics:
+    """单个数据源的运行指标"""
+    polls: int = 0
+    failures: int = 0
+    articles: int = 0
+    new_articles: int = 0
+    last_poll_seconds: float = 0.0
+
+
+class Source(ABC):
+    """公告数据源插件
+
+    子类实现 fetch(获取原始内容)、parse(从原始内容中取出原始文章记录)
+    和 normalize(单条原始记录转换为Article,包括生成链接),
+    即可接入统一的调度、去重、指标和通知流程。
+    """
+    name: str = ''
+    interval: float = MONITOR_INTERVAL
+
+    def __init__(self):
+        self.differ = ArticleDiffer()
+        self.metrics = SourceMetrics()
+        if self.name not in BREAKERS:
+            BREAKERS[self.name] = CircuitBreaker(self.name, failure_threshold=5, recovery_timeout=300)
+        self.breaker = BREAKERS[self.name]
+
+    @abstractmethod
+    async def fetch(self) -> Optional[Any]:
+        """获取原始内容,失败时返回None"""
+
+    @abstractmethod
+    def parse(self, content: Any) -> Optional[List[Any]]:
+        """从原始内容中取出原始文章记录,失败时返回None"""
+
+    @abstractmethod
+    def normalize(self, record: Any) -> Article:
+        """将一条原始文章记录转换为Article"""
+
+    async def start(self) -> None:
+        """调度开始前调用一次,用于启动数据源自身的后台任务"""
+
+    async def poll(self) -> Optional[List[Article]]:
+        """执行一次轮询: fetch -> parse -> normalize,返回当前页面上的文章"""
+        content = await self.fetch()
+        if content is None:
+            return None
+        try:
+            records = self.parse(content)
+            if records is None:
+                return None
+            normalize = self.normalize
+            return [normalize(record) for record in records]
+        except (KeyError, TypeError, ValueError) as e:
+            log_with_time(f"🔴 [{self.name}] Error parsing announcements: {e}")
+            return None
+
+    async def handle_events(self, events: List[ArticleEvent], is_first_run: bool) -> None:
+        """处理变化事件: 首次运行只记录日志,之后推送从未见过的新文章"""
+        if is_first_run:
+            log_with_time(f"🔵 [{self.name}] First run, {len(events)} articles loaded")
+            return
+        for event in events:
+            if event.kind == ADDED and event.fresh:
+                article = event.article
+                log_with_time(f"🟢 Article: [{self.name}] {article.title}")
+                await send_routed_message(article)
+
+    async def wait_next_poll(self) -> None:
+        """等待下一次轮询"""
+        await asyncio.sleep(self.interval)
+
+
+async def run_source(source: Source) -> None:
+    """轮询单个数据源并送入去重和通知流程"""
+    log_with_time(f"🟢 Starting {source.name} monitor...")
+    await source.start()
+    while True:
+        # 熔断器状态变化时发送告警(已内置告警次数限制),并补发之前未送达的通知
+        try:
+            await send_breaker_alerts()
+            await flush_pending_messages()
+        except Exception as e:
+            log_with_time(f"🔴 Error sending breaker alerts: {e}")
+
+        metrics = source.metrics
+        try:
+            started = time.perf_counter()
+            try:
+                articles = await source.poll()
+            finally:
+                startup.mark_first_poll()
+            metrics.polls += 1
+            metrics.last_poll_seconds = time.perf_counter() - started
+            if articles is None:
+                metrics.failures += 1
+                log_with_time(f"🔴 [{source.name}] No articles found in this check")
+            else:
+                is_first_run = not source.differ.initialized
+                events = source.differ.diff(articles)
+                metrics.articles = len(articles)
+                if not is_first_run:
+                    metrics.new_articles += sum(1 for event in events if event.kind == ADDED and event.fresh)
+                await source.handle_events(events, is_first_run)
+                log_with_time(
+                    f"📊 [{source.name}] poll #{metrics.polls} {metrics.last_poll_seconds:.2f}s, "
+                    f"{metrics.articles} articles, {metrics.new_articles} new total, {metrics.failures} failures"
+                )
+        except Exception as e:
+            metrics.failures += 1
+            log_with_time(f"🔴 Error in {source.name} monitor loop: {e}")
+
+        await source.wait_next_poll()
+
+
+async def run_sources(sources: List[Source]) -> None:
+    """在同一事件循环中并发调度所有数据源"""
+    await asyncio.gather(*(run_source(source) for source in sources))
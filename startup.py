@@ -0,0 +1,60 @@
+import asyncio
+import importlib
+import time
+from datetime import datetime
+from types import ModuleType
+from typing import Dict, Optional
+
+# 进程启动基准时间,需在main中最先导入
+STARTED_AT = time.perf_counter()
+
+# 模块名 -> 导入耗时(秒)
+IMPORT_TIMES: Dict[str, float] = {}
+# 启动阶段名 -> 距启动的耗时(秒)
+MILESTONES: Dict[str, float] = {}
+
+first_poll_at: Optional[float] = None
+first_poll_done = asyncio.Event()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """按需导入模块并记录首次导入耗时"""
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    if name not in IMPORT_TIMES:
+        IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+def mark(milestone: str) -> None:
+    """记录一个启动阶段完成的时间点"""
+    if milestone not in MILESTONES:
+        MILESTONES[milestone] = time.perf_counter() - STARTED_AT
+
+
+def mark_first_poll() -> None:
+    """记录首次公告轮询完成的时间并输出启动报告,只在第一次调用时生效"""
+    global first_poll_at
+    if first_poll_at is not None:
+        return
+    first_poll_at = time.perf_counter() - STARTED_AT
+    first_poll_done.set()
+    log_startup_report()
+
+
+async def wait_first_poll() -> None:
+    """等待首次公告轮询完成,用于推迟非关键功能的初始化"""
+    await first_poll_done.wait()
+
+
+def log_startup_report() -> None:
+    """输出启动阶段耗时和按需导入模块的耗时"""
+    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    lines = [f"[{current_time}] ⏱️ Startup report:"]
+    for milestone, elapsed in MILESTONES.items():
+        lines.append(f"    {milestone}: {elapsed * 1000:.1f} ms")
+    if first_poll_at is not None:
+        lines.append(f"    time to first poll: {first_poll_at * 1000:.1f} ms")
+    for name, elapsed in sorted(IMPORT_TIMES.items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"    import {name}: {elapsed * 1000:.1f} ms")
+    print("\n".join(lines))
@@ -0,0 +1,73 @@
+import zlib
+from collections import OrderedDict
+from typing import Optional, NamedTuple, Tuple
+
+from article import Article
+from config import MESSAGE_CACHE_SIZE
+from emoji import get_emoji_and_type
+from util import build_message
+
+TEXT = "text"
+MARKDOWN = "markdown"
+FORMATS = (TEXT, MARKDOWN)
+
+
+class RenderedMessage(NamedTuple):
+    """渲染完成的推送消息"""
+    content: str
+    link: str
+    msgtype: str
+
+
+def build_markdown_message(emoji: str, announcement_type: str, title: str, release_date: str, link: str) -> str:
+    """构建企业微信markdown格式的推送消息"""
+    link_line = f"[🔗 查看公告]({link})" if link else "🔗: 无链接"
+    return (
+        f"### {emoji} {announcement_type}\n"
+        f"> 📌: {title}\n"
+        f"> 🕒: <font color=\"comment\">{release_date}</font>\n"
+        f"{link_line}"
+    )
+
+
+class MessageRenderer:
+    def __init__(self, maxsize: int = MESSAGE_CACHE_SIZE):
+        """文章消息渲染器
+
+        每篇文章每种格式只渲染一次,结果按 (id, 标题哈希, 发布时间, 格式) 缓存在LRU中,
+        批量推送时各推送目标共用同一份文本。
+        """
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Tuple, RenderedMessage]" = OrderedDict()
+
+    def render(self, article: Article, msgtype: str = TEXT) -> RenderedMessage:
+        """渲染文章消息"""
+        key = (article.id, zlib.crc32(article.title.encode('utf-8')), article.release_date, msgtype)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        link = article.link
+        if msgtype == MARKDOWN:
+            emoji, announcement_type = get_emoji_and_type(article.title)
+            content = build_markdown_message(emoji, announcement_type, article.title, article.formatted_date, link)
+        else:
+            content = build_message(title=article.title, release_date=article.formatted_date, link=link)
+        rendered = RenderedMessage(content, link, msgtype)
+
+        self._cache[key] = rendered
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return rendered
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+renderer = MessageRenderer()
+
+
+def render_article(article: Article, msgtype: str = TEXT) -> RenderedMessage:
+    """使用共享渲染器渲染文章消息"""
+    return renderer.render(article, msgtype)
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# 被测模块位于仓库根目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 部分模块导入时会在当前目录下创建data目录,测试在临时目录中运行,避免改动运行数据
+os.chdir(tempfile.mkdtemp(prefix='binance-news-tests-'))
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+import breaker as breaker_module
+from breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(breaker_module.time, 'time', clock)
+    return clock
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_opens_after_threshold_within_window(clock):
+    breaker = CircuitBreaker('test', failure_threshold=3, failure_window=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 61
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=60)
+    open_breaker(breaker)
+
+    clock.now += 59
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_doubles_recovery_timeout(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=60, max_recovery_timeout=100)
+    open_breaker(breaker)
+
+    clock.now += 60
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.recovery_timeout == 100
+
+    clock.now += 99
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.recovery_timeout == 60
+
+
+def test_cancelled_probe_releases_slot(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=60)
+    open_breaker(breaker)
+    clock.now += 60
+
+    async def probe():
+        with breaker.request() as allowed:
+            assert allowed
+            await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_stale_request_does_not_release_newer_probe(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=60)
+    with breaker.request() as allowed:
+        assert allowed
+        open_breaker(breaker)
+        clock.now += 60
+        assert breaker.allow_request()
+    # 熔断前发起的请求退出时不影响之后的探测
+    assert not breaker.allow_request()
+
+
+def test_lost_probe_times_out(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=60, probe_timeout=30)
+    open_breaker(breaker)
+    clock.now += 60
+    assert breaker.allow_request()
+    clock.now += 30
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+
+
+def test_alerts_are_rate_limited(clock):
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=1, alert_limit=2, alert_window=3600)
+    for _ in range(3):
+        breaker.record_failure()
+        clock.now += 1
+        assert breaker.allow_request()
+        breaker.record_success()
+    alerts = breaker.take_alerts()
+    assert len(alerts) == 2
+    assert breaker.take_alerts() == []
+
+    clock.now += 3601
+    breaker.record_failure()
+    assert len(breaker.take_alerts()) == 1
@@ -0,0 +1,86 @@
+from article import Article, LISTING, NEWS
+from differ import ArticleDiffer, ADDED, CHANGED, REMOVED
+
+
+def listing(id, title, release_date):
+    return Article(id, f"code{id}", title, release_date, LISTING)
+
+
+def news(id, title, release_date):
+    return Article(id, f"code{id}", title, release_date, NEWS)
+
+
+def kinds(events):
+    return [(event.kind, event.article_id) for event in events]
+
+
+def test_first_diff_adds_everything():
+    differ = ArticleDiffer()
+    events = differ.diff([listing(1, "A", 1000), news(2, "B", 2000)])
+    assert kinds(events) == [(ADDED, 1), (ADDED, 2)]
+    assert differ.initialized
+    assert differ.watermark == 2000
+
+
+def test_duplicate_ids_are_reported_once():
+    differ = ArticleDiffer()
+    events = differ.diff([listing(1, "A", 1000), news(1, "A", 1000)])
+    assert kinds(events) == [(ADDED, 1)]
+    assert events[0].source == LISTING
+
+
+def test_unchanged_page_has_no_events():
+    differ = ArticleDiffer()
+    page = [listing(1, "A", 1000), listing(2, "B", 2000)]
+    differ.diff(page)
+    assert differ.diff(page) == []
+
+
+def test_new_id_below_watermark_is_fresh():
+    differ = ArticleDiffer()
+    # 其他分类的文章把高水位线推到5000
+    differ.diff([listing(1, "A", 3000), news(2, "News", 5000)])
+    events = differ.diff([listing(3, "New listing", 4000), listing(1, "A", 3000), news(2, "News", 5000)])
+    assert kinds(events) == [(ADDED, 3)]
+    assert events[0].fresh
+
+
+def test_reappeared_article_is_not_fresh():
+    differ = ArticleDiffer()
+    differ.diff([listing(1, "A", 1000), listing(2, "B", 2000)])
+    events = differ.diff([listing(2, "B", 2000)])
+    assert kinds(events) == [(REMOVED, 1)]
+    assert events[0].previous == ("A", 1000)
+    assert events[0].source == LISTING
+
+    events = differ.diff([listing(1, "A", 1000), listing(2, "B", 2000)])
+    assert kinds(events) == [(ADDED, 1)]
+    assert not events[0].fresh
+
+
+def test_changed_title_and_date():
+    differ = ArticleDiffer()
+    differ.diff([listing(1, "A", 1000)])
+    events = differ.diff([listing(1, "A (edited)", 1500)])
+    assert kinds(events) == [(CHANGED, 1)]
+    assert events[0].title_changed
+    assert events[0].date_changed
+    assert events[0].previous == ("A", 1000)
+    assert not events[0].fresh
+
+
+def test_seen_ids_are_bounded_and_keep_current_page():
+    differ = ArticleDiffer(seen_limit=3)
+    differ.diff([listing(1, "A", 1000)])
+    differ.diff([listing(2, "B", 900), listing(3, "C", 800), listing(4, "D", 700)])
+    assert list(differ.seen) == [2, 3, 4]
+    # 被淘汰的id再次出现时按新文章处理
+    events = differ.diff([listing(1, "A", 1000)])
+    assert events[0].kind == ADDED and events[0].fresh
+
+
+def test_has_title():
+    differ = ArticleDiffer()
+    differ.diff([listing(1, "A", 1000)])
+    assert differ.has_title("A")
+    assert not differ.has_title("B")
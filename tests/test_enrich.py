@@ -0,0 +1,83 @@
+import json
+
+from enrich import extract_article_text, extract_article_details, build_details_message
+
+
+def detail_page(body) -> str:
+    app_data = {'appState': {}, 'pageData': {'redux': {'cmsArticle': {'articleDetail': {'title': 'x', 'body': body}}}}}
+    return (
+        '<html><body>'
+        f'<script id="__APP_DATA" type="application/json">{json.dumps(app_data)}</script>'
+        '</body></html>'
+    )
+
+
+def rich_text(*paragraphs: str) -> str:
+    return json.dumps({
+        'node': 'root',
+        'child': [{'node': 'element', 'tag': 'p', 'child': [{'node': 'text', 'text': p}]} for p in paragraphs],
+    })
+
+
+def test_listing_time_prefers_trading_pairs_sentence():
+    text = (
+        "Users can deposit JUP from 2024-01-31 09:00 (UTC). "
+        "Binance will open trading for the JUP/USDT and JUP/FDUSD trading pairs at 2024-01-31 15:00 (UTC)."
+    )
+    details = extract_article_details(text)
+    assert details['listing_time'] == "2024-01-31 15:00 (UTC)"
+    assert details['pairs'] == ["JUP/USDT", "JUP/FDUSD"]
+
+
+def test_listing_time_falls_back_to_first_utc_time():
+    details = extract_article_details("Trading starts on 2024-02-01 10:00:00 (UTC).")
+    assert details['listing_time'] == "2024-02-01 10:00:00 (UTC)"
+
+
+def test_deposits_already_open():
+    details = extract_article_details("Users can now start depositing JUP in preparation for trading.")
+    assert details['deposit_open'] == "已开放"
+
+
+def test_deposit_opening_time():
+    details = extract_article_details("Deposits for JUP will open at 2024-01-31 09:00 (UTC) on the Solana network.")
+    assert details['deposit_open'] == "2024-01-31 09:00 (UTC)"
+
+
+def test_rich_text_body_is_flattened():
+    html = detail_page(rich_text("Binance will list JUP/USDT.", "Deposits open at 2024-01-31 09:00 (UTC)."))
+    assert extract_article_text(html) == "Binance will list JUP/USDT. Deposits open at 2024-01-31 09:00 (UTC)."
+
+
+def test_html_body_falls_back_to_stripped_tags():
+    html = detail_page("<p>Binance will list <b>JUP/USDT</b>.</p>")
+    text = extract_article_text(html)
+    assert "<" not in text
+    assert extract_article_details(text)['pairs'] == ["JUP/USDT"]
+
+
+def test_page_without_app_data_uses_stripped_html():
+    text = extract_article_text("<html><body><p>Trading pairs at 2024-01-31 15:00 (UTC)</p></body></html>")
+    assert extract_article_details(text)['listing_time'] == "2024-01-31 15:00 (UTC)"
+
+
+def test_details_message_lists_found_fields():
+    message = build_details_message("Binance Will List Jupiter (JUP)", {
+        'pairs': ["JUP/USDT"],
+        'listing_time': "2024-01-31 15:00 (UTC)",
+        'deposit_open': "已开放",
+    })
+    assert message == (
+        "📋 公告详情补充\n"
+        "📌: Binance Will List Jupiter (JUP)\n"
+        "💱: JUP/USDT\n"
+        "⏰ 上线时间: 2024-01-31 15:00 (UTC)\n"
+        "📥 充值开放: 已开放"
+    )
+
+
+def test_page_with_nothing_to_extract_sends_no_message():
+    html = detail_page(rich_text("Binance will hold a community AMA next week."))
+    details = extract_article_details(extract_article_text(html))
+    assert details == {'pairs': [], 'listing_time': None, 'deposit_open': None}
+    assert build_details_message("Community AMA", details) is None
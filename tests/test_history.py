@@ -0,0 +1,87 @@
+import pytest
+
+import history
+from article import Article
+from history import ArticleStore, MAX_PAGE_SIZE, extract_symbols
+
+DAY = 24 * 60 * 60 * 1000
+
+
+def test_extracts_symbols_in_order():
+    assert extract_symbols("Binance Will List Jupiter (JUP) with Seed Tag Applied") == ["JUP"]
+    assert extract_symbols("Binance Adds JUP/USDT, WIF/FDUSD on Cross Margin") == ["JUP", "WIF"]
+    assert extract_symbols("Binance Will Delist ANT, MULTI and VAI on 2024-02-20") == ["ANT", "MULTI", "VAI"]
+
+
+def test_ignores_time_zones_and_networks():
+    assert extract_symbols("Delist BNX on 2024-01-01 (UTC)") == ["BNX"]
+    assert extract_symbols("Binance Opens Jupiter (JUP) Deposits on BNB Smart Chain (BEP20)") == ["JUP"]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, 'DATA_DIR', tmp_path)
+    store = ArticleStore('test_history.db')
+    yield store
+    store.close()
+
+
+def listing(id: int, title: str, release_date: int) -> Article:
+    return Article(id, f"code{id}", title, release_date, 'New Cryptocurrency Listing')
+
+
+def test_query_by_symbol_newest_first(store):
+    store.record([
+        listing(1, "Binance Will List Jupiter (JUP)", 1 * DAY),
+        listing(2, "Binance Adds JUP/USDT, WIF/FDUSD on Cross Margin", 2 * DAY),
+        listing(3, "Binance Will List dogwifhat (WIF)", 3 * DAY),
+    ])
+    result = store.query(symbol='jup')
+    assert result['total'] == 2
+    assert [item['id'] for item in result['items']] == [2, 1]
+    assert sorted(result['items'][0]['symbols']) == ['JUP', 'WIF']
+    assert result['items'][1]['category'] == '新币上线公告'
+    assert result['items'][1]['link'].endswith('code1')
+
+
+def test_end_is_exclusive(store):
+    store.record([listing(i, f"Binance Will List Token{i} (TK{i})", i * DAY) for i in range(1, 5)])
+    result = store.query(start=2 * DAY, end=4 * DAY)
+    assert [item['id'] for item in result['items']] == [3, 2]
+    assert store.query(start=4 * DAY)['total'] == 1
+
+
+def test_category_filter(store):
+    store.record([
+        listing(1, "Binance Will List Jupiter (JUP)", 1 * DAY),
+        listing(2, "Binance Adds JUP/USDT on Cross Margin", 2 * DAY),
+        listing(3, "Binance Launchpool: Jupiter (JUP)", 3 * DAY),
+    ])
+    result = store.query(symbol='JUP', category='杠杆公告')
+    assert result['total'] == 1
+    assert result['items'][0]['id'] == 2
+
+
+def test_paging_bounds(store):
+    store.record([listing(i, f"Binance Will List Token{i} (TK{i})", i * DAY) for i in range(1, 8)])
+    result = store.query(page=2, page_size=3)
+    assert result['total'] == 7
+    assert [item['id'] for item in result['items']] == [4, 3, 2]
+    assert [item['id'] for item in store.query(page=3, page_size=3)['items']] == [1]
+    assert store.query(page=4, page_size=3)['items'] == []
+
+    # 页码和每页数量超出范围时被限制在有效范围内
+    clamped = store.query(page=0, page_size=0)
+    assert (clamped['page'], clamped['page_size']) == (1, 1)
+    assert [item['id'] for item in clamped['items']] == [7]
+    assert store.query(page_size=MAX_PAGE_SIZE + 1)['page_size'] == MAX_PAGE_SIZE
+
+
+def test_title_change_reindexes_symbols(store):
+    store.record([listing(1, "Binance Will List Jupiter (JUP)", 1 * DAY)])
+    store.record([listing(1, "Binance Will List Wormhole (W2)", 1 * DAY)])
+    assert store.query(symbol='JUP')['total'] == 0
+    result = store.query(symbol='W2')
+    assert result['total'] == 1
+    assert result['items'][0]['title'] == "Binance Will List Wormhole (W2)"
+    assert store.query()['total'] == 1
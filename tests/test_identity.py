@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import identity as identity_module
+from identity import IdentityPool, HEALTH_RECOVERY_SECONDS, COOLDOWN_SECONDS
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(identity_module.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def pool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(identity_module, 'IDENTITY_DIR', tmp_path)
+    return tmp_path
+
+
+def make_pool(size: int = 3) -> IdentityPool:
+    return IdentityPool(size=size, proxies=[None])
+
+
+def challenge_until_cooldown(pool: IdentityPool, identity) -> None:
+    while identity.cooldown_until == 0.0:
+        pool.report_challenge(identity)
+
+
+def test_healthy_identities_rotate_by_last_use(clock, pool_dir):
+    pool = make_pool()
+    picked = []
+    for _ in range(6):
+        identity = pool.acquire()
+        pool.report_success(identity)
+        picked.append(identity.name)
+        clock.now += 1
+    assert picked == ['0', '1', '2', '0', '1', '2']
+
+
+def test_challenged_identity_cools_down_and_is_skipped(clock, pool_dir):
+    pool = make_pool()
+    bad = pool.identities[0]
+    challenge_until_cooldown(pool, bad)
+    assert bad.cooldown_until == clock.now + COOLDOWN_SECONDS
+
+    for _ in range(4):
+        assert pool.acquire() is not bad
+        clock.now += 1
+
+
+def test_challenged_identity_recovers_and_rejoins_rotation(clock, pool_dir):
+    pool = make_pool()
+    bad = pool.identities[0]
+    challenge_until_cooldown(pool, bad)
+
+    # 其他身份持续成功,分数保持满分
+    for _ in range(10):
+        identity = pool.acquire()
+        assert identity is not bad
+        pool.report_success(identity)
+        clock.now += 30
+
+    clock.now += HEALTH_RECOVERY_SECONDS
+    picked = set()
+    for _ in range(3):
+        identity = pool.acquire()
+        pool.report_success(identity)
+        picked.add(identity.name)
+        clock.now += 1
+    assert bad.score == 1.0
+    assert '0' in picked
+
+
+def test_recovery_is_partial_before_recovery_time(clock, pool_dir):
+    pool = make_pool()
+    bad = pool.identities[0]
+    pool.report_challenge(bad)
+    score = bad.score
+
+    clock.now += HEALTH_RECOVERY_SECONDS / 10
+    pool.acquire()
+    assert bad.score == pytest.approx(score + 0.1)
+
+
+def test_state_persists_score_and_recovers_across_restart(clock, pool_dir):
+    pool = make_pool()
+    bad = pool.identities[1]
+    challenge_until_cooldown(pool, bad)
+    saved = json.loads((pool_dir / 'pool_state.json').read_text())
+    assert saved['1'] == {'score': bad.score, 'updated_at': clock.now}
+
+    restarted = make_pool()
+    assert restarted.identities[1].score == bad.score
+
+    # 停机期间的时间同样计入恢复
+    clock.now += HEALTH_RECOVERY_SECONDS
+    restarted.acquire()
+    assert restarted.identities[1].score == 1.0
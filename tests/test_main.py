@@ -0,0 +1,61 @@
+import asyncio
+
+import history
+import main
+import source
+import startup
+
+
+def test_monitor_restart_cancels_old_tasks_and_survives_api_failure(monkeypatch):
+    """查询接口端口被占用时不影响监控;Coinglass监控出错重启时,仍在运行的数据源任务先被取消"""
+    monkeypatch.setattr(main, 'ENABLE_HISTORY_API', True)
+    monkeypatch.setattr(main, 'ENABLE_MEMORY_WATCHDOG', False)
+    monkeypatch.setattr(main, 'MONITOR_RESTART_DELAY', 0)
+    monkeypatch.setattr(main, 'services_task', None)
+    monkeypatch.setattr(main, 'build_sources', lambda: [])
+    monkeypatch.setattr(startup, 'first_poll_done', asyncio.Event())
+    api_attempts = []
+    pollers = []
+    live_pollers = set()
+    coinglass_runs = []
+
+    async def start_history_api(store):
+        api_attempts.append(store)
+        raise OSError("address already in use")
+
+    async def run_sources(sources):
+        poller = len(pollers)
+        pollers.append(poller)
+        live_pollers.add(poller)
+        try:
+            startup.first_poll_done.set()
+            await asyncio.Event().wait()
+        finally:
+            live_pollers.discard(poller)
+
+    async def run_coinglass_monitor():
+        coinglass_runs.append(len(coinglass_runs))
+        await asyncio.sleep(0.01)
+        if len(coinglass_runs) < 3:
+            raise RuntimeError("scrape failed")
+
+    monkeypatch.setattr(history, 'start_history_api', start_history_api)
+    monkeypatch.setattr(source, 'run_sources', run_sources)
+    monkeypatch.setattr(main, 'run_coinglass_monitor', run_coinglass_monitor)
+
+    async def scenario():
+        monitor = asyncio.create_task(main.run_all_monitors())
+        while len(coinglass_runs) < 3:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        assert not monitor.done()
+        assert len(pollers) == 3
+        assert live_pollers == {2}
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+        await main.services_task
+
+    asyncio.run(scenario())
+    assert len(api_attempts) == 1
+    assert main.history_api_runner is None
+    assert live_pollers == set()
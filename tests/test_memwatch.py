@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+import memwatch
+from memwatch import MemoryWatchdog, growth_rate_mb_per_hour, RESTART_COOLDOWN
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(memwatch.time, 'time', clock)
+    return clock
+
+
+def test_growth_rate_fits_linear_trend():
+    samples = [(t * 600, 100 + t * 5) for t in range(6)]
+    assert growth_rate_mb_per_hour(samples) == pytest.approx(30.0)
+
+
+def test_growth_rate_ignores_noise_and_decline():
+    # 围绕同一水平的抖动不应被当作持续增长
+    noisy = [(0, 100), (600, 104), (1200, 100), (1800, 104), (2400, 100), (3000, 104), (3600, 100)]
+    assert abs(growth_rate_mb_per_hour(noisy)) < 1
+    assert growth_rate_mb_per_hour([(0, 200), (3600, 150)]) == pytest.approx(-50.0)
+
+
+def test_growth_rate_needs_two_distinct_times():
+    assert growth_rate_mb_per_hour([]) == 0.0
+    assert growth_rate_mb_per_hour([(0, 100)]) == 0.0
+    assert growth_rate_mb_per_hour([(0, 100), (0, 200)]) == 0.0
+
+
+def make_watchdog(hooks):
+    watchdog = MemoryWatchdog(interval=1, rss_limit_mb=100, growth_limit_mb_per_hour=10)
+    calls = []
+    for name, released in hooks.items():
+        async def restart(name=name, released=released):
+            calls.append(name)
+            if isinstance(released, Exception):
+                raise released
+            return released
+        watchdog.register(name, restart)
+    return watchdog, calls
+
+
+def test_restart_respects_cooldown(clock):
+    watchdog, calls = make_watchdog({'sessions': True})
+    watchdog.samples.append((clock.now, 200))
+
+    asyncio.run(watchdog.restart_subsystems("test"))
+    assert calls == ['sessions']
+    assert not watchdog.samples
+
+    clock.now += RESTART_COOLDOWN - 1
+    asyncio.run(watchdog.restart_subsystems("test"))
+    assert calls == ['sessions']
+
+    clock.now += 1
+    asyncio.run(watchdog.restart_subsystems("test"))
+    assert calls == ['sessions', 'sessions']
+
+
+def test_idle_subsystem_does_not_enter_cooldown(clock):
+    watchdog, calls = make_watchdog({'browsers': False})
+    watchdog.samples.append((clock.now, 200))
+
+    asyncio.run(watchdog.restart_subsystems("test"))
+    # 没有可释放的资源时保留采样,下次检查时再次尝试
+    assert watchdog.samples
+    assert 'browsers' not in watchdog.last_restart
+
+    clock.now += 60
+    asyncio.run(watchdog.restart_subsystems("test"))
+    assert calls == ['browsers', 'browsers']
+
+
+def test_failed_restart_enters_cooldown_without_blocking_others(clock):
+    watchdog, calls = make_watchdog({'broken': RuntimeError("boom"), 'sessions': True})
+
+    asyncio.run(watchdog.restart_subsystems("test"))
+    clock.now += 60
+    asyncio.run(watchdog.restart_subsystems("test"))
+    assert calls == ['broken', 'sessions']
+    assert set(watchdog.last_restart) == {'broken', 'sessions'}
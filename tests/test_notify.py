@@ -0,0 +1,87 @@
+import asyncio
+
+from aiohttp import web
+
+import breaker as breaker_module
+import util
+
+
+async def start_webhook(responses, received):
+    """本地webhook服务,按顺序返回给定的 (状态码, JSON) 响应"""
+    async def handler(request):
+        received.append((await request.json())['text']['content'])
+        status, body = responses.pop(0) if len(responses) > 1 else responses[0]
+        return web.json_response(body, status=status)
+
+    app = web.Application()
+    app.router.add_post('/send', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}/send"
+
+
+def run_with_webhook(monkeypatch, responses, scenario):
+    monkeypatch.setattr(util, 'USE_PROXY', False)
+    monkeypatch.setattr(breaker_module, 'WEBHOOK_BREAKERS', {})
+    monkeypatch.setattr(util, 'WEBHOOK_BREAKERS', breaker_module.WEBHOOK_BREAKERS)
+    util.pending_messages.clear()
+    received = []
+
+    async def main():
+        runner, url = await start_webhook(responses, received)
+        try:
+            return await scenario(url)
+        finally:
+            await util.close_sessions()
+            await runner.cleanup()
+
+    result = asyncio.run(main())
+    return result, received
+
+
+def test_delivered_only_when_errcode_is_zero(monkeypatch):
+    async def scenario(url):
+        return await util.send_message_async("hello", url)
+
+    sent, received = run_with_webhook(monkeypatch, [(200, {'errcode': 0, 'errmsg': 'ok'})], scenario)
+    assert sent is True
+    assert received == ["hello"]
+    assert not util.pending_messages
+
+
+def test_rejected_message_is_queued_and_resent(monkeypatch):
+    responses = [
+        (200, {'errcode': 45009, 'errmsg': 'api freq out of limit'}),
+        (200, {'errcode': 0, 'errmsg': 'ok'}),
+    ]
+
+    async def scenario(url):
+        sent = await util.send_message_async("listing", url)
+        assert list(util.pending_messages) == [("listing", url, "text")]
+        assert len(breaker_module.get_webhook_breaker(url)._failures) == 1
+        await util.flush_pending_messages()
+        return sent
+
+    sent, received = run_with_webhook(monkeypatch, responses, scenario)
+    assert sent is False
+    assert received == ["listing", "listing"]
+    assert not util.pending_messages
+
+
+def test_repeated_rejections_open_webhook_breaker(monkeypatch):
+    async def scenario(url):
+        breaker = breaker_module.get_webhook_breaker(url)
+        for i in range(breaker.failure_threshold):
+            await util.send_message_async(f"message {i}", url)
+        assert breaker.state == breaker_module.OPEN
+        # 熔断打开后不再请求webhook,消息直接进入补发队列
+        await util.send_message_async("while open", url)
+        return breaker.failure_threshold
+
+    threshold, received = run_with_webhook(monkeypatch, [(200, {'errcode': 93000, 'errmsg': 'invalid webhook url'})], scenario)
+    assert len(received) == threshold
+    assert len(util.pending_messages) == threshold + 1
+    util.pending_messages.clear()
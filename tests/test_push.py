@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import aiohttp
+from aiohttp import web
+
+import push
+from push import AnnouncementStream, parse_push_message
+
+
+def data_message(title, publish_date=1700000000000):
+    return {
+        'type': 'DATA',
+        'topic': push.PUSH_TOPIC,
+        'data': json.dumps({'catalogName': 'New Cryptocurrency Listing', 'title': title, 'publishDate': publish_date}),
+    }
+
+
+async def start_server(handler):
+    app = web.Application()
+    app.router.add_get('/ws', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"ws://127.0.0.1:{port}/ws"
+
+
+def test_parse_push_message():
+    article = parse_push_message(data_message("Binance Will List Jupiter (JUP)"))
+    assert article.title == "Binance Will List Jupiter (JUP)"
+    assert article.id == article.title
+    assert article.release_date == 1700000000000
+    assert article.link == ''
+    assert parse_push_message({'type': 'COMMAND', 'data': 'SUBSCRIBE'}) is None
+
+
+def test_stream_resubscribes_after_reconnect(monkeypatch):
+    """本地WebSocket服务每次连接推送一条公告后断开,客户端应重连、重新订阅并收到每条公告"""
+    monkeypatch.setattr(push, 'RECONNECT_BASE_DELAY', 0.01)
+    subscriptions = []
+    received = []
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        msg = await ws.receive()
+        subscriptions.append(json.loads(msg.data))
+        await ws.send_str("not json")
+        await ws.send_json(data_message(f"Announcement {len(subscriptions)}"))
+        await ws.close()
+        return ws
+
+    async def main():
+        runner, url = await start_server(handler)
+        done = asyncio.Event()
+
+        async def on_article(article):
+            received.append(article.title)
+            if len(received) == 2:
+                done.set()
+
+        stream = AnnouncementStream(on_article, url=url)
+        stream.start()
+        try:
+            await asyncio.wait_for(done.wait(), 5)
+        finally:
+            await stream.stop()
+            await runner.cleanup()
+
+    asyncio.run(main())
+    assert received == ["Announcement 1", "Announcement 2"]
+    assert subscriptions[:2] == [{'command': 'SUBSCRIBE', 'value': push.PUSH_TOPIC}] * 2
+
+
+def test_stream_reports_health():
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        # 保持连接直到客户端断开
+        async for _ in ws:
+            pass
+        return ws
+
+    async def main():
+        runner, url = await start_server(handler)
+
+        async def on_article(article):
+            pass
+
+        stream = AnnouncementStream(on_article, url=url)
+        stream.start()
+        try:
+            for _ in range(100):
+                if stream.healthy:
+                    break
+                await asyncio.sleep(0.01)
+            assert stream.healthy
+        finally:
+            await stream.stop()
+            await runner.cleanup()
+        assert not stream.healthy
+
+    asyncio.run(main())
+
+
+def test_backoff_resets_after_connection(monkeypatch):
+    """连接成功后即使以异常断开,下次重连也从初始退避时间开始"""
+    monkeypatch.setattr(push.random, 'uniform', lambda a, b: 0)
+    waits = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        waits.append(delay)
+        await real_sleep(0)
+
+    outcomes = iter(['fail', 'fail', 'fail', 'connect_then_fail', 'fail'])
+
+    class FakeStream(AnnouncementStream):
+        async def _connect_once(self):
+            outcome = next(outcomes, None)
+            if outcome is None:
+                raise asyncio.CancelledError
+            if outcome == 'connect_then_fail':
+                self._set_connected(True)
+            raise aiohttp.ClientError(outcome)
+
+    async def on_article(article):
+        pass
+
+    async def main():
+        monkeypatch.setattr(push.asyncio, 'sleep', fake_sleep)
+        try:
+            await FakeStream(on_article, url='ws://unused').run()
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    base = push.RECONNECT_BASE_DELAY
+    assert waits == [base, base * 2, base * 4, base, base * 2]
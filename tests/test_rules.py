@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+from article import Article, LISTING, NEWS
+from config import WEBHOOK_URL, NOTIFY_FORMAT
+from rules import Channel, CompiledRules, RuleEngine
+
+LISTING_TITLE = "Binance Will List Jupiter (JUP) with Seed Tag Applied"
+DELIST_TITLE = "Binance Will Delist ANT, MULTI and VAI on 2024-02-20"
+PERPETUAL_TITLE = "Binance Futures Will Launch USDⓈ-M WIF Perpetual Contract With Up to 50x Leverage"
+
+
+def channel(name, **config):
+    return Channel.from_config({'name': name, 'webhook_key': name, **config})
+
+
+def article(title, catalog=LISTING):
+    return Article(1, "code", title, 1700000000000, catalog)
+
+
+def matched(rules, title, catalog=LISTING):
+    return [channel.name for channel in rules.match(article(title, catalog))]
+
+
+def test_channel_without_conditions_matches_everything():
+    rules = CompiledRules([channel('all')])
+    assert matched(rules, LISTING_TITLE) == ['all']
+    assert matched(rules, DELIST_TITLE, NEWS) == ['all']
+
+
+def test_conditions_within_a_dimension_are_or_and_across_dimensions_are_and():
+    rules = CompiledRules([
+        channel('listings', categories=['新币上线公告', 'Launchpool公告'], catalogs=[LISTING]),
+        channel('watchlist', symbols=['jup', 'wif']),
+        channel('jup_listings', categories=['新币上线公告'], symbols=['JUP']),
+    ])
+    assert matched(rules, LISTING_TITLE) == ['listings', 'watchlist', 'jup_listings']
+    assert matched(rules, LISTING_TITLE, NEWS) == ['watchlist', 'jup_listings']
+    assert matched(rules, DELIST_TITLE) == []
+
+
+def test_keywords_are_case_insensitive_and_independent():
+    rules = CompiledRules([
+        channel('delist', keywords=['delist', 'Removal']),
+        channel('futures', keywords=['FUTURES']),
+        channel('both', keywords=['binance']),
+    ])
+    assert matched(rules, DELIST_TITLE) == ['delist', 'both']
+    assert matched(rules, PERPETUAL_TITLE) == ['futures', 'both']
+
+
+def test_patterns_keep_their_own_flags_groups_and_backreferences():
+    rules = CompiledRules([
+        channel('global_flag', patterns=[r'(?i)perpetual\s+contract']),
+        channel('backreference', patterns=[r'\b(\w+) \1\b']),
+        channel('named_group', patterns=[r'(?P<symbol>[A-Z]{2,5})/USDT']),
+        channel('keyword', keywords=['jupiter']),
+    ])
+    assert matched(rules, PERPETUAL_TITLE) == ['global_flag']
+    assert matched(rules, "Binance Will Will List XYZ") == ['backreference']
+    assert matched(rules, "Binance Adds JUP/USDT on Cross Margin") == ['named_group']
+    assert matched(rules, LISTING_TITLE) == ['keyword']
+
+
+def test_keywords_or_patterns_within_a_channel():
+    rules = CompiledRules([channel('text', keywords=['delist'], patterns=[r'Perpetual'])])
+    assert matched(rules, DELIST_TITLE) == ['text']
+    assert matched(rules, PERPETUAL_TITLE) == ['text']
+    assert matched(rules, LISTING_TITLE) == []
+
+
+def test_pattern_only_runs_when_other_dimensions_match():
+    rules = CompiledRules([channel('news_perpetual', catalogs=[NEWS], patterns=['Perpetual'])])
+    assert matched(rules, PERPETUAL_TITLE, NEWS) == ['news_perpetual']
+    assert matched(rules, PERPETUAL_TITLE, LISTING) == []
+
+
+def test_invalid_pattern_names_the_channel():
+    with pytest.raises(ValueError, match="broken"):
+        channel('broken', patterns=['(unclosed'])
+
+
+def test_rule_engine_skips_invalid_channel_and_reloads(tmp_path):
+    rules_file = tmp_path / 'rules.json'
+    rules_file.write_text(json.dumps({
+        'include_default': False,
+        'channels': [
+            {'name': 'broken', 'webhook_url': 'https://example.com/broken', 'patterns': ['(unclosed']},
+            {'name': 'futures', 'webhook_url': 'https://example.com/futures', 'patterns': ['(?i)perpetual']},
+        ],
+    }))
+    engine = RuleEngine(str(rules_file))
+    assert engine.targets(article(PERPETUAL_TITLE)) == [('https://example.com/futures', NOTIFY_FORMAT)]
+    assert engine.targets(article(LISTING_TITLE)) == []
+
+    rules_file.write_text(json.dumps({'channels': []}))
+    os.utime(rules_file, (0, 1))
+    assert engine.targets(article(PERPETUAL_TITLE)) == [(WEBHOOK_URL, NOTIFY_FORMAT)]
+
+
+def test_format_must_be_supported():
+    assert channel('md', format='markdown').format == 'markdown'
+    for bad in ('Markdown', 'md'):
+        with pytest.raises(ValueError, match="format"):
+            channel('bad', format=bad)
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from article import Article
+from source import Source
+
+
+class FakeSource(Source):
+    name = 'fake'
+
+    def __init__(self, content):
+        super().__init__()
+        self.content = content
+
+    async def fetch(self):
+        return self.content
+
+    def parse(self, content):
+        return content['items']
+
+    def normalize(self, raw):
+        return Article(raw['id'], '', raw['title'], raw['time'], 'Fake', url=f"https://example.com/{raw['id']}")
+
+
+def test_poll_drives_parse_and_normalize():
+    source = FakeSource({'items': [{'id': 1, 'title': 'A', 'time': 1000}]})
+    articles = asyncio.run(source.poll())
+    assert articles == [Article(1, '', 'A', 1000, 'Fake', url='https://example.com/1')]
+    assert articles[0].link == 'https://example.com/1'
+
+
+def test_poll_returns_none_on_malformed_content():
+    assert asyncio.run(FakeSource({'unexpected': []}).poll()) is None
+    assert asyncio.run(FakeSource({'items': [{'id': 1}]}).poll()) is None
+    assert asyncio.run(FakeSource(None).poll()) is None
+
+
+def test_source_requires_abstract_methods():
+    class Incomplete(Source):
+        name = 'incomplete'
+
+        async def fetch(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
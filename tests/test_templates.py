@@ -0,0 +1,28 @@
+from article import Article, LISTING
+from templates import MARKDOWN, TEXT, MessageRenderer
+
+
+def test_render_is_cached_per_format():
+    renderer = MessageRenderer()
+    article = Article(1, "abc", "Binance Will List Jupiter (JUP)", 1700000000000, LISTING)
+    text = renderer.render(article, TEXT)
+    assert renderer.render(Article(1, "abc", article.title, article.release_date, LISTING), TEXT) is text
+    markdown = renderer.render(article, MARKDOWN)
+    assert markdown.msgtype == MARKDOWN
+    assert markdown.content.startswith("### ")
+    assert article.link in text.content
+
+
+def test_redated_article_is_rendered_again():
+    renderer = MessageRenderer()
+    article = Article(1, "abc", "Binance Will List Jupiter (JUP)", 1700000000000, LISTING)
+    redated = Article(1, "abc", article.title, 1700003600000, LISTING)
+    assert renderer.render(article).content != renderer.render(redated).content
+    assert redated.formatted_date in renderer.render(redated).content
+
+
+def test_cache_is_bounded():
+    renderer = MessageRenderer(maxsize=2)
+    for i in range(3):
+        renderer.render(Article(i, "abc", f"Title {i}", 1700000000000, LISTING))
+    assert len(renderer._cache) == 2
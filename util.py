@@ -1,27 +1,17 @@
 import aiohttp
-import random
+from collections import deque
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Deque, Tuple
 from pathlib import Path
 import json
 import asyncio
 import re
 
-from cookie import CookieManager
+from breaker import BREAKERS, WEBHOOK_BREAKERS, CircuitBreaker, get_breaker, get_webhook_breaker
+from identity import Identity, IdentityPool
 from config import WEBHOOK_URL, PROXY_URL, USE_PROXY
 from emoji import get_emoji_and_type
 
-# User-Agent池
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:120.0) Gecko/20100101 Firefox/120.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0"
-]
-
 # 文件路径相关配置
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
@@ -30,36 +20,91 @@ DATA_DIR.mkdir(exist_ok=True)
 LISTING_RAW_FILE = "listing_raw.html"
 LISTING_PARSED_FILE = "listing_parsed.json"
 
-# 添加错误推送限制相关的全局变量
-ERROR_MSG_LIMIT = 5  # 每个时间窗口内的最大错误推送次数
-ERROR_MSG_WINDOW = 3600  # 时间窗口大小(秒)
-error_msg_count = 0
-last_error_reset_time = datetime.now()
+# 熔断打开或发送失败时暂存的通知 (消息内容, webhook地址, 消息类型),恢复后按顺序补发
+MAX_PENDING_MESSAGES = 500
+pending_messages: Deque[Tuple[str, str, str]] = deque()
 
-# 初始化CookieManager
-cookie_manager = CookieManager()
+# 初始化身份池
+identity_pool = IdentityPool()
 
-def build_article_link(title: str, code: str) -> str:
-    """构建文章链接
+# 公开接口和企业微信推送共用的HTTP连接池,在事件循环中首次使用时创建
+_shared_session: Optional[aiohttp.ClientSession] = None
+# 每个身份独立的HTTP连接池,保持连接(TLS会话)不会在不同身份之间复用
+_identity_sessions: Dict[str, aiohttp.ClientSession] = {}
+
+def _new_session() -> aiohttp.ClientSession:
+    # 使用DummyCookieJar,cookie完全由请求头控制
+    return aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar())
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """获取共享的HTTP会话,用于不区分身份的请求"""
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = _new_session()
+    return _shared_session
+
+def get_identity_session(identity: Identity) -> aiohttp.ClientSession:
+    """获取身份专用的HTTP会话
+    
+    每个身份使用独立的连接器,请求币安页面时不会复用其他身份建立的keep-alive连接,
+    保证cookie、User-Agent、出口代理和连接在同一身份内一致。
+    """
+    session = _identity_sessions.get(identity.name)
+    if session is None or session.closed:
+        session = _new_session()
+        _identity_sessions[identity.name] = session
+    return session
+
+async def close_sessions() -> bool:
+    """关闭共享会话和所有身份的会话,下次请求时重新创建连接池
+
+    Returns:
+        是否关闭了仍打开的会话
+    """
+    global _shared_session
+    sessions = list(_identity_sessions.values())
+    if _shared_session is not None:
+        sessions.append(_shared_session)
+    _identity_sessions.clear()
+    _shared_session = None
+    sessions = [session for session in sessions if not session.closed]
+    for session in sessions:
+        await session.close()
+    return bool(sessions)
+
+ARTICLE_BASE_URL = "https://www.binance.com/en/support/announcement/"
+# 标题slug使用的正则,预先编译
+SLUG_PUNCTUATION_PATTERN = re.compile(r'[()!?.,:“”#&]')
+SLUG_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def build_article_slug(title: str) -> str:
+    """根据标题生成文章链接中的slug部分
     
     Args:
         title: 文章标题
-        code: 文章code(不是id)
         
     Returns:
-        格式化后的文章链接
+        格式化后的标题slug
     """
-    base_url = "https://www.binance.com/en/support/announcement/"
-    
     # 处理标题格式
     formatted_title = title.lower()
     # 使用正则表达式移除特定标点符号，将撇号替换为连字符
-    formatted_title = re.sub(r'[()!?.,:“”#&]', '', formatted_title)
+    formatted_title = SLUG_PUNCTUATION_PATTERN.sub('', formatted_title)
     formatted_title = formatted_title.replace("'", "-")
     # 将连续的空格替换为单个破折号
-    formatted_title = re.sub(r'\s+', '-', formatted_title)
+    return SLUG_WHITESPACE_PATTERN.sub('-', formatted_title)
+
+def build_article_link(title: str, code: str) -> str:
+    """构建文章链接
     
-    return f"{base_url}{formatted_title}-{code}"
+    Args:
+        title: 文章标题
+        code: 文章code(不是id)
+        
+    Returns:
+        格式化后的文章链接
+    """
+    return f"{ARTICLE_BASE_URL}{build_article_slug(title)}-{code}"
 
 def build_message(title: str, 
                  release_date: str, 
@@ -84,115 +129,226 @@ def build_message(title: str,
         f"🔗: {link if link else '无链接'}"
     )
 
-async def send_message_async(message_content: str, is_error: bool = False) -> None:
+async def send_message_async(message_content: str,
+                             webhook_url: Optional[str] = None,
+                             msgtype: str = "text",
+                             is_alert: bool = False) -> bool:
     """发送消息到企业微信机器人
     
+    每个webhook地址使用独立的熔断器。熔断打开或发送失败时,
+    公告通知暂存到补发队列,由flush_pending_messages补发;告警消息直接丢弃。
+    
     Args:
         message_content: 要发送的消息内容
-        is_error: 是否为错误消息
-    """
-    global error_msg_count, last_error_reset_time
-    
-    # 检查是否需要重置错误计数
-    now = datetime.now()
-    if (now - last_error_reset_time).total_seconds() >= ERROR_MSG_WINDOW:
-        error_msg_count = 0
-        last_error_reset_time = now
-    
-    # 如果是错误消息且已达到限制,则只记录日志
-    if is_error:
-        if error_msg_count >= ERROR_MSG_LIMIT:
-            log_with_time(f"Error message suppressed (limit reached): {message_content}")
-            return
-        error_msg_count += 1
+        webhook_url: 目标webhook地址,默认为配置的WEBHOOK_URL
+        msgtype: 消息类型,"text" 或 "markdown"
+        is_alert: 是否为熔断/错误告警
         
-    headers = {'Content-Type': 'application/json'}
-    payload = {
-        "msgtype": "text",
-        "text": {
-            "content": message_content
+    Returns:
+        是否发送成功
+    """
+    webhook_url = webhook_url or WEBHOOK_URL
+    if await _deliver_message(message_content, webhook_url, msgtype):
+        return True
+    if is_alert:
+        log_with_time(f"Alert dropped: {message_content}")
+    else:
+        if len(pending_messages) >= MAX_PENDING_MESSAGES:
+            dropped, _, _ = pending_messages.popleft()
+            log_with_time(f"Pending queue full, message dropped: {dropped}")
+        pending_messages.append((message_content, webhook_url, msgtype))
+        log_with_time(f"Message queued for retry ({len(pending_messages)} pending)")
+    return False
+
+async def _deliver_message(message_content: str, webhook_url: str, msgtype: str) -> bool:
+    """在webhook熔断器允许时发送一条消息,返回是否发送成功"""
+    breaker = get_webhook_breaker(webhook_url)
+    with breaker.request() as allowed:
+        if not allowed:
+            log_with_time(f"⛔ Circuit {breaker.name} is {breaker.state}, message not sent")
+            return False
+            
+        headers = {'Content-Type': 'application/json'}
+        payload = {
+            "msgtype": msgtype,
+            msgtype: {
+                "content": message_content
+            }
         }
-    }
-    
-    log_with_time(f"Sending message: {message_content}")
+        
+        log_with_time(f"Sending message: {message_content}")
 
-    proxy = PROXY_URL if USE_PROXY else None
-    async with aiohttp.ClientSession() as session:
-        async with session.post(WEBHOOK_URL, json=payload, headers=headers, proxy=proxy) as response:
-            if response.status == 200:
-                log_with_time("Message sent successfully!")
-            else:
-                log_with_time(f"Failed to send message: {response.status}")
+        proxy = PROXY_URL if USE_PROXY else None
+        try:
+            session = get_shared_session()
+            async with session.post(webhook_url, json=payload, headers=headers, proxy=proxy) as response:
+                if response.status != 200:
+                    breaker.record_failure()
+                    log_with_time(f"Failed to send message: {response.status}")
+                    return False
+                # 企业微信拒收的消息(限流45009、key无效93000等)同样返回200,以errcode为准
+                result = await response.json(content_type=None)
+                if result.get('errcode') == 0:
+                    breaker.record_success()
+                    log_with_time("Message sent successfully!")
+                    return True
+                breaker.record_failure()
+                log_with_time(f"Message rejected: errcode={result.get('errcode')} errmsg={result.get('errmsg')}")
+        except Exception as e:
+            breaker.record_failure()
+            log_with_time(f"Error sending message: {e}")
+        return False
+
+async def flush_pending_messages() -> None:
+    """按顺序补发暂存的通知,某个地址发送失败后本轮不再尝试该地址"""
+    if not pending_messages:
+        return
+    messages = list(pending_messages)
+    pending_messages.clear()
+    failed_urls = set()
+    for message in messages:
+        message_content, webhook_url, msgtype = message
+        if webhook_url not in failed_urls and await _deliver_message(message_content, webhook_url, msgtype):
+            continue
+        failed_urls.add(webhook_url)
+        pending_messages.append(message)
+    if pending_messages:
+        log_with_time(f"{len(pending_messages)} messages still pending")
+
+async def send_breaker_alerts() -> None:
+    """发送各上游熔断器的状态告警,企业微信自身的告警只记录日志"""
+    for breaker in WEBHOOK_BREAKERS.values():
+        for alert in breaker.take_alerts():
+            log_with_time(alert)
+    for breaker in BREAKERS.values():
+        for alert in breaker.take_alerts():
+            await send_message_async(alert, is_alert=True)
 
 def log_with_time(message: str, module: str = '') -> None:
     """打印带时间戳和模块名的消息"""
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{current_time}] {message}")
 
-async def get_headers(referer: str = '') -> Dict[str, str]:
-    """生成请求头,支持自动更新cookie"""
-    cookie = cookie_manager.get_cookies()
+async def refresh_identity_cookies(identity: Identity) -> str:
+    """在Cookie刷新熔断器允许时刷新身份的cookie"""
+    breaker = get_breaker('cookie')
+    with breaker.request() as allowed:
+        if not allowed:
+            raise RuntimeError("Cookie refresh circuit is open")
+        try:
+            cookie = await identity.refresh_cookies()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return cookie
+
+async def get_headers(identity: Identity, referer: str = '') -> Dict[str, str]:
+    """根据身份生成请求头,支持自动更新cookie
+    
+    Args:
+        identity: 请求使用的身份,User-Agent与客户端提示均来自该身份
+        referer: 可选的referer
+    """
+    cookie = identity.get_cookies()
     if not cookie:
         try:
-            cookie = await cookie_manager.update_cookies()
+            cookie = await refresh_identity_cookies(identity)
         except Exception as e:
             log_with_time(f"Failed to get cookies: {e}")
             raise
     
-    return {
+    headers = {
         'authority': 'www.binance.com',
         'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
         'accept-encoding': 'gzip, deflate, br, zstd',
         'accept-language': 'zh-CN,zh;q=0.9,en;q=0.8,zh-TW;q=0.7',
         'cache-control': 'max-age=0',
-        'User-Agent': random.choice(USER_AGENTS),
+        'User-Agent': identity.user_agent,
         'cookie': cookie,
-        'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"Windows"',
+        **identity.client_hints(),
         'sec-fetch-dest': 'document',
         'sec-fetch-mode': 'navigate',
         'sec-fetch-site': 'same-origin',
         'sec-fetch-user': '?1',
         'upgrade-insecure-requests': '1'
     }
+    if referer:
+        headers['referer'] = referer
+    return headers
 
-async def fetch_and_save_html_content(url: str, filename: str, max_retries: int = 3) -> Optional[str]:
-    """获取并保存HTML内容,支持cookie自动更新"""
+async def fetch_and_save_html_content(url: str,
+                                      filename: Optional[str],
+                                      max_retries: int = 3,
+                                      breaker: Optional[CircuitBreaker] = None) -> Optional[str]:
+    """获取并保存HTML内容,支持cookie自动更新
+    
+    filename为None时只返回内容,不保存到文件。
+    
+    重试由熔断器控制,熔断打开时直接返回None,不再发起请求。
+    页面不存在(404)时不再重试,也不计入身份的健康分数。
+    
+    Args:
+        url: 页面地址
+        filename: 保存的文件名
+        max_retries: 最大尝试次数
+        breaker: 使用的熔断器,默认为Binance页面熔断器
+    """
+    breaker = breaker or get_breaker('binance')
     for attempt in range(max_retries):
-        try:
-            headers = await get_headers()
-            log_with_time(f"Starting request to {url}")
-            log_with_time(f"Using cookie: {headers['cookie'][:50]}...")
-            
-            proxy = PROXY_URL if USE_PROXY else None
-            log_with_time(f"Attempt {attempt + 1}/{max_retries} with proxy: {proxy}")
-            
-            async with aiohttp.ClientSession() as session:
+        with breaker.request() as allowed:
+            if not allowed:
+                log_with_time(f"⛔ Circuit {breaker.name} is {breaker.state}, skipping request")
+                return None
+            identity = identity_pool.acquire()
+            recorded = False
+            try:
+                headers = await get_headers(identity)
+                log_with_time(f"Starting request to {url}")
+                log_with_time(f"Using identity {identity.name}, cookie: {headers['cookie'][:50]}...")
+                
+                proxy = identity.proxy
+                log_with_time(f"Attempt {attempt + 1}/{max_retries} with proxy: {proxy}")
+                
+                session = get_identity_session(identity)
                 async with session.get(url, headers=headers, proxy=proxy) as response:
                     log_with_time(f"🔄 Response status: {response.status}")
                     
                     if response.status == 202:
-                        log_with_time("🔑 Cookie expired, updating...")
-                        await cookie_manager.update_cookies()
+                        log_with_time(f"🔑 Cookie of identity {identity.name} expired, updating...")
+                        breaker.record_failure()
+                        recorded = True
+                        identity_pool.report_challenge(identity)
+                        await refresh_identity_cookies(identity)
                         continue
                         
                     if response.status == 200:
                         content = await response.text()
+                        breaker.record_success()
+                        identity_pool.report_success(identity)
                         
                         # 保存内容到文件
-                        file_path = DATA_DIR / filename
-                        file_path.write_text(content, encoding='utf-8')
-                        log_with_time(f"💾 Content saved to {file_path}")
+                        if filename:
+                            file_path = DATA_DIR / filename
+                            file_path.write_text(content, encoding='utf-8')
+                            log_with_time(f"💾 Content saved to {file_path}")
                         
                         return content
+                    elif response.status == 404:
+                        breaker.record_failure()
+                        log_with_time(f"❌ Page not found: {url}")
+                        return None
                     else:
+                        breaker.record_failure()
+                        identity_pool.report_challenge(identity)
                         log_with_time(f"❌ Request failed with status: {response.status}")
                         
-        except Exception as e:
-            log_with_time(f"Error in attempt {attempt + 1}: {e}")
-            if attempt == max_retries - 1:
-                raise
+            except Exception as e:
+                log_with_time(f"Error in attempt {attempt + 1}: {e}")
+                if not recorded:
+                    breaker.record_failure()
+                if attempt == max_retries - 1:
+                    raise
             
         await asyncio.sleep(2 ** attempt)  # 指数退避
     